@@ -0,0 +1,436 @@
+from array import array
+import bisect
+import heapq
+import sys
+
+from searchWorkspace import get_workspace
+
+
+class AdjacencyArrays:
+    """
+    This class holds a compact, index based copy of the adjacency
+    lists of a Graph, laid out in compressed sparse row form.
+    The Edges leaving the vertex at index i are found at the
+    positions offsets[i] up to (but not including) offsets[i + 1]
+    of the targets, weights and edges lists.
+    Searches over these arrays work with vertex indices only, so
+    they never have to look up a Vertex index by its name.
+    Extra weight layers (travel time, traffic, ...) are stored as
+    more weight arrays in the same edge order.  get_layer returns
+    arrays sharing the offsets, targets and edges of these ones but
+    using a layer's weights, so every search runs on any layer and
+    switching layers copies nothing.
+    """
+    def __init__(self, graph=None):
+        """
+        Create the arrays from the adjacency lists of the graph
+        Instance variables:
+            self.offsets: array of int, one entry per vertex plus one
+            self.targets: array of int, index of the to_vertex of each edge
+            self.weights: array of float, weight of each edge
+            self.edges: Python list of the Edge objects in array order
+            self.layers: Python dictionary of the AdjacencyArrays of
+                         each weight layer, keyed by layer name (None
+                         for the edge weights), shared by all of them
+            self.scale: float: smallest ratio of these weights to the
+                        edge weights, to scale distance lower bounds
+        """
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.weights = array('d')
+        self.edges = []
+        self.layers = {None: self}
+        self.scale = 1.0
+
+        if graph is not None:
+            for vertex in graph.get_vertices():
+                for edge in graph.get_neighbors(vertex):
+                    self.targets.append(graph.get_vert_index(edge.to_vertex))
+                    self.weights.append(edge.get_weight())
+                    self.edges.append(edge)
+                self.offsets.append(len(self.targets))
+
+    def get_size(self):
+        """
+        Return the number of vertices
+        """
+        return len(self.offsets) - 1
+
+    def add_layer(self, name, weights, scale=None):
+        """
+        Add the weight layer name: an array holding
+        a weight for every edge, in array order.  scale is the
+        layer's smallest weight ratio, when already known
+        """
+        if len(weights) != len(self.targets):
+            raise ValueError("Weight layer " + str(name) + " does not match the edges")
+
+        base = self.layers[None]
+        layer = AdjacencyArrays()
+        layer.offsets = self.offsets
+        layer.targets = self.targets
+        layer.edges = self.edges
+        layer.weights = weights
+        layer.layers = self.layers
+        if scale is None:
+            ratios = [weight / base_weight for weight, base_weight in zip(weights, base.weights)
+                      if base_weight > 0]
+            scale = min(ratios, default=1.0)
+        layer.scale = scale
+        self.layers[name] = layer
+        return layer
+
+    def get_layer(self, name):
+        """
+        Return the arrays of the weight layer name
+        (the edge weights when name is None)
+        """
+        if name not in self.layers:
+            raise ValueError("Unknown weight layer: " + str(name))
+        return self.layers[name]
+
+    def get_num_edges(self):
+        """
+        Return the number of edges
+        """
+        return len(self.targets)
+
+    def reverse(self):
+        """
+        Return new arrays holding every edge turned around,
+        so a search over them follows the roads backwards
+        """
+        size = self.get_size()
+        counts = [0] * (size + 1)
+        for target in self.targets:
+            counts[target + 1] += 1
+        for i in range(size):
+            counts[i + 1] += counts[i]
+
+        reverse = AdjacencyArrays()
+        reverse.offsets = array('l', counts)
+        reverse.targets = array('l', [0] * len(self.targets))
+        reverse.weights = array('d', [0.0] * len(self.targets))
+        reverse.edges = [None] * len(self.targets)
+
+        next_slot = counts[:-1]
+        for index in range(size):
+            for pos in range(self.offsets[index], self.offsets[index + 1]):
+                slot = next_slot[self.targets[pos]]
+                next_slot[self.targets[pos]] += 1
+                reverse.targets[slot] = index
+                reverse.weights[slot] = self.weights[pos]
+                reverse.edges[slot] = self.edges[pos]
+        return reverse
+
+    def search(self, source, targets=None, workspace=None):
+        """
+        Run a heap based Dijkstra search from the source index,
+        leaving the costs and parent indices in the SearchWorkspace
+        (the current thread's one when workspace is None).
+        When targets (a collection of indices) is given the search
+        stops as soon as every one of them has been settled.
+        Return the workspace.  The thread's workspace is reset by the
+        next search run on the thread, so read what is needed from it
+        before searching again, or pass a SearchWorkspace of your own
+        """
+        if workspace is None:
+            workspace = get_workspace(self.get_size())
+        else:
+            workspace.reset(self.get_size())
+
+        offsets = self.offsets
+        vert_targets = self.targets
+        weights = self.weights
+
+        # Local names for the workspace lists: an entry only counts
+        # when its stamp matches the epoch of this search
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        parents = workspace.parents
+        workspace.set_cost(source, 0)
+
+        remaining = None
+        if targets is not None:
+            remaining = set(targets)
+
+        heap = [(0, source)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            visit_stamps[index] = epoch
+
+            # Prune once every requested target is settled
+            if remaining is not None:
+                remaining.discard(index)
+                if not remaining:
+                    break
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    parents[neighbor] = index
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        return workspace
+
+    def dijkstra(self, source, targets=None):
+        """
+        Run search and return its results as new lists:
+        the cost list (sys.maxsize when not reached) and
+        the list of parent indices (-1 for none)
+        """
+        workspace = self.search(source, targets)
+        cost = [workspace.get_cost(index) for index in range(self.get_size())]
+        parents = [workspace.get_parent(index) for index in range(self.get_size())]
+        return cost, parents
+
+    def shortest_path(self, source, dest, banned_vertices=None, banned_edges=None):
+        """
+        Run a point to point Dijkstra search from source to dest,
+        stopping as soon as dest is settled.  Vertex indices in
+        banned_vertices and edge positions in banned_edges are
+        skipped.  Return the cost and the list of edge positions on
+        the path, or sys.maxsize and None when dest is not reached
+        """
+        workspace = get_workspace(self.get_size())
+
+        offsets = self.offsets
+        vert_targets = self.targets
+        weights = self.weights
+
+        # The workspace parents hold the position of the edge
+        # each vertex was reached by
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        parent_edge = workspace.parents
+        workspace.set_cost(source, 0)
+
+        heap = [(0, source)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            visit_stamps[index] = epoch
+
+            if index == dest:
+                # Walk the parent edges back to the source
+                path = []
+                while index != source:
+                    pos = parent_edge[index]
+                    path.append(pos)
+                    index = self._edge_source(pos)
+                path.reverse()
+                return dist, path
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                if banned_edges is not None and pos in banned_edges:
+                    continue
+                if banned_vertices is not None and neighbor in banned_vertices:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    parent_edge[neighbor] = pos
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        return sys.maxsize, None
+
+    def multi_source_path(self, starts, finishes, best_cost=sys.maxsize):
+        """
+        Find the cheapest way from any of several starts to any of
+        several finishes with one Dijkstra search.  starts is a list
+        of (index, cost already spent getting there) and finishes a
+        list of (index, cost still to pay from there).  Return the
+        total cost, the numbers of the start and the finish used and
+        the list of edge positions between them, or best_cost and
+        None, None, None when nothing is cheaper than best_cost
+        """
+        workspace = get_workspace(self.get_size())
+        offsets = self.offsets
+        vert_targets = self.targets
+        weights = self.weights
+
+        # The workspace parents hold the position of the edge each
+        # vertex was reached by, and -1 at the starts
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        parent_edge = workspace.parents
+
+        heap = []
+        start_num = {}
+        for num, (index, start_cost) in enumerate(starts):
+            if reach_stamps[index] != epoch or start_cost < cost[index]:
+                workspace.set_cost(index, start_cost)
+                parent_edge[index] = -1
+                start_num[index] = num
+                heapq.heappush(heap, (start_cost, index))
+
+        finish_at = {}
+        for num, (index, finish_cost) in enumerate(finishes):
+            finish_at.setdefault(index, []).append((num, finish_cost))
+
+        best = None
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            visit_stamps[index] = epoch
+            # Nothing left can beat the best way found
+            if dist >= best_cost:
+                break
+
+            for num, finish_cost in finish_at.get(index, ()):
+                if dist + finish_cost < best_cost:
+                    best_cost = dist + finish_cost
+                    best = (index, num)
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    parent_edge[neighbor] = pos
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        if best is None:
+            return best_cost, None, None, None
+
+        # Walk the parent edges back to the start
+        index, finish = best
+        path = []
+        while parent_edge[index] != -1:
+            pos = parent_edge[index]
+            path.append(pos)
+            index = self._edge_source(pos)
+        path.reverse()
+        return best_cost, start_num[index], finish, path
+
+    def _edge_source(self, pos):
+        """
+        Return the index of the vertex the edge at pos leaves from
+        """
+        return bisect.bisect_right(self.offsets, pos) - 1
+
+    def astar(self, source, dest, heuristic):
+        """
+        Run an A* search from source to dest, where heuristic(index)
+        returns a lower bound on the cost from index to dest.  The
+        heuristic must be consistent (never more than the edge weight
+        plus the bound at the other end).  Return the cost and the
+        list of edge positions on the path, or sys.maxsize and None
+        when dest is not reached
+        """
+        workspace = get_workspace(self.get_size())
+
+        offsets = self.offsets
+        vert_targets = self.targets
+        weights = self.weights
+
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        parent_edge = workspace.parents
+        workspace.set_cost(source, 0)
+
+        # Heap entries are ordered by cost so far plus the bound
+        heap = [(heuristic(source), 0, source)]
+        while heap:
+            estimate, dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            visit_stamps[index] = epoch
+
+            if index == dest:
+                path = []
+                while index != source:
+                    pos = parent_edge[index]
+                    path.append(pos)
+                    index = self._edge_source(pos)
+                path.reverse()
+                return dist, path
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    parent_edge[neighbor] = pos
+                    heapq.heappush(heap, (new_cost + heuristic(neighbor), new_cost, neighbor))
+
+        return sys.maxsize, None
+
+    def bounded_search(self, source, max_cost, workspace=None):
+        """
+        Run a Dijkstra search from the source index that never goes
+        past max_cost, so its work grows with the number of vertices
+        within reach rather than with the size of the graph.
+        Return the list of indices settled, in order of cost, and the
+        workspace holding their costs and parent indices (the current
+        thread's one when workspace is None, valid only until the
+        next search, as for search)
+        """
+        if workspace is None:
+            workspace = get_workspace(self.get_size())
+        else:
+            workspace.reset(self.get_size())
+
+        offsets = self.offsets
+        vert_targets = self.targets
+        weights = self.weights
+
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        parents = workspace.parents
+        workspace.set_cost(source, 0)
+
+        order = []
+        heap = [(0, source)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            visit_stamps[index] = epoch
+            order.append(index)
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+
+                # Vertices past the budget are never queued
+                if new_cost > max_cost:
+                    continue
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    parents[neighbor] = index
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        return order, workspace
@@ -0,0 +1,231 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
+
+from componentIndex import ComponentIndex
+from edge import Edge
+from mst import MST
+from sharedArrays import SharedArrays
+
+"""
+Borůvka minimum spanning trees.
+
+Each round every component picks its cheapest edge to another
+component, and all the picked edges are added at once, so the number
+of components at least halves every round.
+ 1. The edge arrays (source, target and weight of every edge) and
+    the component label of every vertex live in shared memory.
+ 2. Worker processes each scan a slice of the edge array and return,
+    for every component they saw, its cheapest outgoing edge.
+ 3. The calling process keeps the cheapest of those per component,
+    merges the components in a ComponentIndex and writes the new
+    labels back to shared memory for the next round.
+Edges are compared by (weight, lower end index, higher end index,
+edge position), so ties always go the same way and the picked edges
+can never form a cycle.  Roads are taken to run both ways, as they
+do in the map files.
+"""
+
+# Edge arrays shorter than this are scanned in-process
+MIN_PARALLEL_EDGES = 1 << 16
+
+# Shared arrays of the worker processes
+_worker_shared = None
+_worker_arrays = None
+
+
+class BoruvkaMST:
+    """
+    This class builds minimum spanning trees of a Graph with
+    Borůvka's algorithm.  The trees it returns have the same edges,
+    total weight and search order as get_min_spanning_tree whenever
+    the minimum spanning tree is unique (for example when no two
+    roads have the same length); with ties both give a tree of the
+    same total weight
+    """
+    def __init__(self, graph, workers=None, layer=None):
+        """
+        Copy the edge arrays of graph into shared memory and,
+        when workers (os.cpu_count() when None) is more than 1,
+        start the worker processes.  Edges are weighed with the
+        named weight layer, if given.  Call close() when done
+        Instance variables:
+            self.graph: Graph the trees span
+            self.workers: int
+            self.shared: SharedArrays holding the arrays below
+            self.sources, self.targets, self.weights: memoryviews of
+                the end points and weight of every edge
+            self.labels: memoryview of the component of every vertex
+            self.executor: ProcessPoolExecutor, or None
+        """
+        adjacency = graph.get_adjacency_arrays(layer)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        sources = array('l')
+        for index in range(adjacency.get_size()):
+            sources.extend(array('l', [index]) * (adjacency.offsets[index + 1]
+                                                  - adjacency.offsets[index]))
+
+        self.graph = graph
+        self.workers = workers
+        self.shared = SharedArrays()
+        self.sources = self.shared.add(sources)
+        self.targets = self.shared.add(adjacency.targets)
+        self.weights = self.shared.add(adjacency.weights)
+        self.labels = self.shared.add(array('l', range(adjacency.get_size())))
+
+        self.executor = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(max_workers=workers,
+                                                initializer=_init_worker,
+                                                initargs=(self.shared.get_specs(),))
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_forest_edges(self):
+        """
+        Return the sorted list of positions (in the adjacency
+        arrays) of the edges of the minimum spanning forest
+        """
+        size = len(self.labels)
+        num_edges = len(self.sources)
+        components = ComponentIndex(size)
+        for index in range(size):
+            self.labels[index] = index
+
+        chosen = []
+        while True:
+            # Cheapest outgoing edge of every component
+            if self.executor is None or num_edges < MIN_PARALLEL_EDGES:
+                best = _cheapest_edges(self.shared.views, 0, num_edges)
+            else:
+                step = (num_edges + self.workers - 1) // self.workers
+                starts = list(range(0, num_edges, step))
+                best = {}
+                for part in self.executor.map(_cheapest_chunk, starts,
+                                              [min(start + step, num_edges) for start in starts]):
+                    for label, key in part.items():
+                        if label not in best or key < best[label]:
+                            best[label] = key
+
+            merged = False
+            for label in sorted(best):
+                weight, low, high, pos = best[label]
+                if not components.same_component(low, high):
+                    components.union(low, high)
+                    chosen.append(pos)
+                    merged = True
+            if not merged:
+                break
+
+            for index in range(size):
+                self.labels[index] = components.find(index)
+
+        chosen.sort()
+        return chosen
+
+    def get_min_spanning_tree(self, root, forest=False):
+        """
+        Return the MST rooted at root, built like
+        get_min_spanning_tree: the tree spans the component of root,
+        or, when forest is True, every component gets a tree rooted
+        at its first vertex
+        """
+        graph = self.graph
+        vertices = graph.get_vertices()
+        size = len(vertices)
+
+        # The forest edges, both ways round, by vertex
+        tree_edges = [[] for i in range(size)]
+        for pos in self.get_forest_edges():
+            source = self.sources[pos]
+            target = self.targets[pos]
+            tree_edges[source].append((target, self.weights[pos]))
+            tree_edges[target].append((source, self.weights[pos]))
+
+        # Walk the forest the way get_min_spanning_tree walks the
+        # graph: cheapest edge first, lowest vertex index among ties
+        parents = [None] * size
+        search_order = []
+        edges = []
+        total_weight = 0
+        roots = [root]
+        added = [False] * size
+        heap = [(0.0, graph.get_vert_index(root), -1)]
+        next_root = 0
+        while True:
+            if not heap:
+                if not forest:
+                    break
+                while next_root < size and added[next_root]:
+                    next_root += 1
+                if next_root == size:
+                    break
+                roots.append(vertices[next_root])
+                heapq.heappush(heap, (0.0, next_root, -1))
+
+            weight, index, parent = heapq.heappop(heap)
+            if added[index]:
+                continue
+            added[index] = True
+            search_order.append(vertices[index])
+            total_weight += weight
+            if parent != -1:
+                parents[index] = vertices[parent]
+                edges.append(Edge(vertices[parent], vertices[index], weight))
+
+            for neighbor, edge_weight in tree_edges[index]:
+                if not added[neighbor]:
+                    heapq.heappush(heap, (edge_weight, neighbor, index))
+
+        return MST(root, search_order, parents, vertices, edges, total_weight, roots)
+
+
+def _cheapest_edges(views, start, end):
+    """
+    Return a dictionary holding, for each component label, the
+    key (weight, low, high, position) of its cheapest edge to
+    another component among the edges at positions start to end
+    """
+    sources, targets, weights, labels = views
+    best = {}
+    for pos in range(start, end):
+        source = sources[pos]
+        target = targets[pos]
+        source_label = labels[source]
+        target_label = labels[target]
+        if source_label == target_label:
+            continue
+        if source < target:
+            key = (weights[pos], source, target, pos)
+        else:
+            key = (weights[pos], target, source, pos)
+        for label in (source_label, target_label):
+            if label not in best or key < best[label]:
+                best[label] = key
+    return best
+
+
+def _init_worker(specs):
+    global _worker_shared, _worker_arrays
+    _worker_shared = SharedArrays.attach(specs)
+    _worker_arrays = tuple(_worker_shared.views)
+
+
+def _cheapest_chunk(start, end):
+    return _cheapest_edges(_worker_arrays, start, end)
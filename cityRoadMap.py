@@ -1,52 +1,541 @@
-from graph import Graph
-
-
-class CityRoadMap(Graph):
-    """
-    This class represent a Graph with City Vertices and Road Edges.
-    """
-    def __init__(self, cities=None, roads=None):
-        """
-        Construct a CityRoadMap Graph
-        using Cities and Roads stored in lists
-        """
-        if cities is None or roads is None:
-            super().__init__()
-        else:
-            super().__init__(cities, roads)
-
-    def get_neighboring_cities(self, city):
-        """
-        Return the neighbors of the City Vertex as a list
-        """
-        city_list = self.get_neighbors(city)
-
-        return city_list
-
-    def get_roads_str(self):
-        """
-        Create string of Cities and
-        Roads with distances and direction
-        """
-        roads_str = ""
-
-        for city in self.vertices:
-            roads = self.get_neighboring_cities(city)
-            city_name = city.get_name()
-            roads_str += "[ " + city_name + " ]:\n"
-            for road in roads:
-                roads_str += "  " + str(road) + "\n"
-            roads_str += "\n"
-        return roads_str
-
-    def get_cities_str(self):
-        """
-        Create string of Cities with GPS coordinates and population
-        """
-        cities_str = ""
-
-        for city in self.vertices:
-            city_name = city.get_name()
-            cities_str += str(self.get_vertex(city_name)) + "\n"
-
-        return cities_str
+from concurrent.futures import ProcessPoolExecutor
+import bisect
+import heapq
+import math
+import sys
+
+from graph import Graph
+from adjacencyArrays import AdjacencyArrays
+from road import Road
+from roadLink import link_road
+from searchWorkspace import get_workspace
+
+
+class CityRoadMap(Graph):
+    """
+    This class represent a Graph with City Vertices and Road Edges.
+    """
+    def __init__(self, cities=None, roads=None, undirected=False):
+        """
+        Construct a CityRoadMap Graph
+        using Cities and Roads stored in lists
+        When undirected is True, add_road stores each road once:
+        the two directions share one RoadGeometry
+        Instance variables:
+            self.pop_keys: Python list of City populations, ascending
+            self.pop_order: Python list of City indices, in the
+                            same order as pop_keys
+            self.undirected: bool
+            self.unpaired: Python dictionary of the RoadGeometry of
+                           roads whose way back has not been added yet,
+                           keyed by (from index, to index)
+        """
+        if cities is None or roads is None:
+            super().__init__()
+        else:
+            super().__init__(cities, roads)
+        self.undirected = undirected
+        self.unpaired = {}
+
+        # Population index: sorted once here, then kept
+        # in order as each City is added
+        self.pop_order = []
+        if self.vertices is not None:
+            self.pop_order = sorted(range(len(self.vertices)),
+                                    key=lambda index: self.vertices[index].get_pop())
+        self.pop_keys = [self.vertices[index].get_pop() for index in self.pop_order]
+
+    def add_vertex(self, city):
+        """
+        Adds a City to the map and to the population index
+        """
+        super().add_vertex(city)
+        pos = bisect.bisect_right(self.pop_keys, city.get_pop())
+        self.pop_keys.insert(pos, city.get_pop())
+        self.pop_order.insert(pos, len(self.vertices) - 1)
+
+    def get_cities_by_pop(self, descending=False):
+        """
+        Return an iterator over the Cities in order of population,
+        without copying or reordering the vertices list.
+        Cities of equal population keep the order they were added in
+        """
+        if descending:
+            order = reversed(self.pop_order)
+        else:
+            order = iter(self.pop_order)
+        return (self.vertices[index] for index in order)
+
+    def get_smallest_cities(self, k):
+        """
+        Return a list of the k Cities with the smallest population
+        """
+        return [self.vertices[index] for index in self.pop_order[:k]]
+
+    def get_largest_cities(self, k):
+        """
+        Return a list of the k Cities with the largest population,
+        largest first
+        """
+        if k <= 0:
+            return []
+        return [self.vertices[index] for index in reversed(self.pop_order[-k:])]
+
+    def get_cities_in_pop_range(self, low, high):
+        """
+        Return a list of the Cities whose population is between
+        low and high (both included), in ascending order
+        """
+        start = bisect.bisect_left(self.pop_keys, low)
+        end = bisect.bisect_right(self.pop_keys, high)
+        return [self.vertices[index] for index in self.pop_order[start:end]]
+
+    def add_road(self, from_city, to_city):
+        """
+        Add the Road from from_city to to_city and return it.
+        In undirected mode, the way back of a road already added
+        reuses its geometry instead of computing it again
+        """
+        if not self.undirected:
+            road = Road(from_city, to_city)
+        else:
+            road = link_road(self.unpaired, from_city, to_city,
+                             self.get_vert_index(from_city), self.get_vert_index(to_city))
+
+        self.add_edge(road)
+        return road
+
+    def freeze(self):
+        """
+        Return an immutable FrozenCityRoadMap snapshot of the map,
+        which any number of threads can query without locks
+        """
+        from frozenCityRoadMap import FrozenCityRoadMap
+        return FrozenCityRoadMap.from_map(self)
+
+    def get_view(self, cities):
+        """
+        Return a SubgraphView of the map holding only the given
+        Cities (names, City objects or indices) and the Roads
+        between them
+        """
+        from subgraphView import SubgraphView
+        return SubgraphView(self, cities)
+
+    def get_view_in_box(self, min_x, min_y, max_x, max_y):
+        """
+        Return a SubgraphView of the map holding the Cities inside
+        the longitude/latitude box and the Roads between them
+        """
+        from subgraphView import SubgraphView
+        return SubgraphView.in_box(self, min_x, min_y, max_x, max_y)
+
+    def contract_chains(self):
+        """
+        Return a ContractedMap of the map, with each chain of
+        pass-through Cities replaced by a single ChainRoad
+        """
+        from contractedMap import ContractedMap
+        return ContractedMap(self)
+
+    def get_snapper(self, cell_size=None):
+        """
+        Return a RoadSnapper of the map, to snap GPS points onto
+        its Roads and route between them
+        """
+        from roadSnapper import RoadSnapper
+        return RoadSnapper(self, cell_size)
+
+    def get_neighboring_cities(self, city):
+        """
+        Return the neighbors of the City Vertex as a list
+        """
+        city_list = self.get_neighbors(city)
+
+        return city_list
+
+    def get_roads_str(self):
+        """
+        Create string of Cities and
+        Roads with distances and direction
+        """
+        roads_str = ""
+
+        for city in self.vertices:
+            roads = self.get_neighboring_cities(city)
+            city_name = city.get_name()
+            roads_str += "[ " + city_name + " ]:\n"
+            for road in roads:
+                roads_str += "  " + str(road) + "\n"
+            roads_str += "\n"
+        return roads_str
+
+    def get_cities_str(self):
+        """
+        Create string of Cities with GPS coordinates and population
+        """
+        cities_str = ""
+
+        for city in self.vertices:
+            city_name = city.get_name()
+            cities_str += str(self.get_vertex(city_name)) + "\n"
+
+        return cities_str
+
+    def get_straight_line_heuristic(self, dest, scale=1.0):
+        """
+        Return a function giving, for a City index, the straight line
+        distance in miles to the City at index dest, measured the same
+        way Road distances are.  No chain of Roads is shorter, so it is
+        a lower bound for A*.  For a weight layer, scale is the
+        smallest ratio of its weights to the Road distances
+        """
+        x_coords = [math.radians(city.get_X()) for city in self.vertices]
+        y_coords = [math.radians(city.get_Y()) for city in self.vertices]
+        dest_x = x_coords[dest]
+        dest_y = y_coords[dest]
+
+        def heuristic(index):
+            return math.sqrt((x_coords[index] - dest_x) ** 2
+                             + (y_coords[index] - dest_y) ** 2) * 3956 * scale
+
+        return heuristic
+
+    def get_astar_path(self, source_city, dest_city, landmarks=None, layer=None):
+        """
+        Return the shortest path from source_city to dest_city found
+        with A*, as a tuple (total cost, list of Roads).  The search is
+        guided by the triangle inequality bounds of the given Landmarks,
+        or by straight line distance when landmarks is None.
+        Roads are weighed with the named weight layer, if given; the
+        Landmarks must have been built for the same layer.
+        The cost is sys.maxsize and the list None when unreachable
+        """
+        adjacency = self.get_adjacency_arrays(layer)
+        dest = self.get_vert_index(dest_city)
+        if landmarks is None:
+            heuristic = self.get_straight_line_heuristic(dest, adjacency.scale)
+        elif landmarks.layer != layer:
+            raise ValueError("The Landmarks were built for another weight layer")
+        else:
+            heuristic = landmarks.get_heuristic(dest)
+
+        cost, path = adjacency.astar(self.get_vert_index(source_city), dest, heuristic)
+        if path is None:
+            return cost, None
+        return cost, [adjacency.edges[pos] for pos in path]
+
+    def get_cities_within(self, city, max_cost, layer=None):
+        """
+        Return the Cities within max_cost miles of city by road,
+        as a list of (City, cost, parent City) tuples in order of
+        cost.  The parent of city itself is None
+        """
+        return self.get_isochrone_rings(city, [max_cost], layer)[0]
+
+    def get_isochrone_rings(self, city, budgets, layer=None):
+        """
+        Return the Cities reachable from city within each of the
+        budgets (e.g. [50, 100, 150] miles) from a single search.
+        The result holds one ring per budget in ascending budget
+        order; a ring lists the (City, cost, parent City) tuples
+        costing more than the previous budget and at most its own.
+        With a weight layer the budgets are in the layer's units.
+        Raises ValueError for a negative budget
+        """
+        budgets = sorted(budgets)
+        rings = [[] for budget in budgets]
+        if not budgets:
+            return rings
+        if budgets[0] < 0:
+            raise ValueError("budgets must not be negative")
+
+        adjacency = self.get_adjacency_arrays(layer)
+        order, workspace = adjacency.bounded_search(self.get_vert_index(city),
+                                                    budgets[-1])
+
+        # order is sorted by cost, so the rings fill one after another,
+        # and once a cost is past the last budget so are all the rest
+        ring = 0
+        for index in order:
+            cost = workspace.get_cost(index)
+            while ring < len(budgets) and cost > budgets[ring]:
+                ring += 1
+            if ring == len(budgets):
+                break
+            parent = workspace.get_parent(index)
+            if parent == -1:
+                parent_city = None
+            else:
+                parent_city = self.vertices[parent]
+            rings[ring].append((self.vertices[index], cost, parent_city))
+        return rings
+
+    def get_city_indices(self, cities):
+        """
+        Return the vertex indices for a list of City names,
+        City objects or indices
+        """
+        indices = []
+        for city in cities:
+            if isinstance(city, int):
+                indices.append(city)
+            elif isinstance(city, str):
+                indices.append(self.vert_dict[city])
+            else:
+                indices.append(self.get_vert_index(city))
+        return indices
+
+    def get_distance_matrix(self, origins, destinations, workers=None, layer=None):
+        """
+        Return a dense matrix (list of rows) of road distances with
+        one row per origin and one column per destination.
+        Origins and destinations may be City names or vertex indices.
+        Unreachable pairs hold sys.maxsize, like the cost list of
+        get_shortest_path.
+        The matrix is filled bucket by bucket.  A plain search from the
+        first origin fills its row and gives a rough distance to each
+        destination.  Then a backward search from each destination, over
+        the reversed roads, settles the vertices up to a share of that
+        distance (the share of origins among all the points) and drops
+        (column, cost) into the buckets at the edge of that ball.
+        Last, a forward search from each other origin reads the buckets
+        of the vertices it reaches and stops once no destination can
+        get any closer (see _bucket_rows).  Without a road hierarchy the
+        searches still cover most of the map between the points: the
+        balls save most when origins and destinations lie in separate
+        clusters, and spread out points cost about what one pruned
+        search per origin would.
+        When workers is more than 1 the backward and forward searches
+        are spread over that many processes.
+        Roads are weighed with the named weight layer, if given
+        """
+        origin_indices = self.get_city_indices(origins)
+        dest_indices = self.get_city_indices(destinations)
+        if not origin_indices or not dest_indices:
+            return [[] for index in origin_indices]
+        adjacency = self.get_adjacency_arrays(layer)
+        reverse = adjacency.reverse()
+
+        workspace = adjacency.search(origin_indices[0], dest_indices)
+        first_row = [workspace.get_cost(index) for index in dest_indices]
+        share = len(origin_indices) / (len(origin_indices) + len(dest_indices))
+        columns = [(column, dest_indices[column], first_row[column] * share)
+                   for column in range(len(dest_indices))]
+
+        # Pairs in different components are never searched for
+        sources = [(index, self.components.find(index)) for index in origin_indices[1:]]
+        dest_labels = [self.components.find(index) for index in dest_indices]
+
+        if workers is not None and workers > 1 and len(dest_indices) > 1:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_matrix_worker,
+                                     initargs=(adjacency.offsets, adjacency.targets,
+                                               adjacency.weights, reverse.offsets,
+                                               reverse.targets, reverse.weights)) as executor:
+                chunks = _split(columns, workers)
+                buckets = {}
+                radii = {}
+                for chunk_buckets, chunk_radii in executor.map(
+                        _matrix_buckets, chunks, [origin_indices] * len(chunks)):
+                    for index, entries in chunk_buckets.items():
+                        buckets.setdefault(index, []).extend(entries)
+                    radii.update(chunk_radii)
+
+                chunks = _split(sources, workers)
+                rows = [first_row]
+                for chunk_rows in executor.map(
+                        _matrix_rows, chunks, [buckets] * len(chunks),
+                        [radii] * len(chunks), [dest_labels] * len(chunks)):
+                    rows.extend(chunk_rows)
+            return rows
+
+        buckets, radii = _fill_buckets(adjacency, reverse, columns, origin_indices)
+        return [first_row] + _bucket_rows(adjacency, sources, buckets, radii, dest_labels)
+
+
+"""
+Helpers for get_distance_matrix: the worker processes keep their
+own copy of the adjacency arrays, handed over once when they start
+"""
+_worker_adjacency = None
+_worker_reverse = None
+
+
+def _split(items, parts):
+    """
+    Split a list into at most parts chunks of about the same size
+    """
+    chunk_size = max(1, (len(items) + parts - 1) // parts)
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def _fill_buckets(adjacency, reverse, columns, origins):
+    """
+    Run a backward search over the reversed arrays from each
+    (column, destination index, stop cost) of columns.  A search
+    stops at the stop cost, or once every origin is settled; its
+    radius is the smallest cost it had not settled by then (infinity
+    when it ran out of vertices).
+    A route from outside the settled ball enters it by a road from a
+    vertex the search reached but did not settle, so only the ends of
+    those roads, and the origins, get (column, cost from the vertex
+    to the destination) in their bucket.
+    Return the buckets, a Python dictionary of lists keyed by vertex
+    index, and a Python dictionary of radius keyed by column
+    """
+    offsets = reverse.offsets
+    vert_targets = reverse.targets
+    weights = reverse.weights
+    origin_set = set(origins)
+
+    buckets = {}
+    radii = {}
+    for column, dest, stop_cost in columns:
+        workspace = get_workspace(reverse.get_size())
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        workspace.set_cost(dest, 0)
+
+        # Bucket entries of this column, keyed by vertex index
+        entries = {}
+        num_origins = 0
+        heap = [(0, dest)]
+        while heap:
+            dist, index = heap[0]
+            if visit_stamps[index] == epoch:
+                heapq.heappop(heap)
+                continue
+            # The destination itself is always settled
+            if entries and (dist >= stop_cost or num_origins == len(origin_set)):
+                break
+            heapq.heappop(heap)
+            visit_stamps[index] = epoch
+            if index in origin_set:
+                entries[index] = dist
+                num_origins += 1
+            elif index == dest:
+                entries[index] = dist
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        # The heap now starts with the cheapest vertex left unsettled
+        if heap:
+            radii[column] = heap[0][0]
+        else:
+            radii[column] = math.inf
+
+        # Every vertex left in the heap was reached but not settled;
+        # its roads out lead into the ball
+        for dist, index in heap:
+            if visit_stamps[index] == epoch:
+                continue
+            for pos in range(adjacency.offsets[index], adjacency.offsets[index + 1]):
+                target = adjacency.targets[pos]
+                if visit_stamps[target] == epoch:
+                    entries[target] = cost[target]
+
+        for index, dist in entries.items():
+            buckets.setdefault(index, []).append((column, dist))
+    return buckets, radii
+
+
+def _bucket_rows(adjacency, sources, buckets, radii, dest_labels):
+    """
+    Return the matrix rows for the (origin index, component label)
+    pairs of sources, by a forward search from each origin that reads
+    the bucket of every vertex as soon as it gets a cost: a path to
+    the vertex plus the bucket's cost from there is a path to that
+    column's destination.
+    A column is done once the search's smallest unsettled cost plus
+    the column's radius is at least the best cost found: a shorter
+    route would have to pass a vertex outside the backward search's
+    ball (at least the radius from the destination) that the forward
+    search has settled, and the bucket of the edge vertex after it
+    would already have been read.  buckets and radii are as returned
+    by _fill_buckets
+    """
+    offsets = adjacency.offsets
+    vert_targets = adjacency.targets
+    weights = adjacency.weights
+    num_columns = len(dest_labels)
+
+    rows = []
+    for source, label in sources:
+        row = [sys.maxsize] * num_columns
+        workspace = get_workspace(adjacency.get_size())
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+        reach_stamps = workspace.reach_stamps
+        cost = workspace.cost
+        workspace.set_cost(source, 0)
+        for column, back in buckets.get(source, ()):
+            if back < row[column]:
+                row[column] = back
+
+        # Max-heap of how far each column still keeps the search going,
+        # best cost minus radius; an entry is stale once the column's
+        # best cost has dropped.  A column whose backward search covered
+        # everything was settled by the source's own bucket
+        gaps = [(radii[column] - row[column], column) for column in range(num_columns)
+                if dest_labels[column] == label and radii[column] != math.inf]
+        heapq.heapify(gaps)
+
+        heap = [(0, source)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if visit_stamps[index] == epoch:
+                continue
+            while gaps and gaps[0][0] != radii[gaps[0][1]] - row[gaps[0][1]]:
+                heapq.heappop(gaps)
+            if not gaps or dist >= -gaps[0][0]:
+                break
+            visit_stamps[index] = epoch
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = vert_targets[pos]
+                if visit_stamps[neighbor] == epoch:
+                    continue
+                new_cost = dist + weights[pos]
+                if reach_stamps[neighbor] != epoch or new_cost < cost[neighbor]:
+                    reach_stamps[neighbor] = epoch
+                    cost[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+                    for column, back in buckets.get(neighbor, ()):
+                        if new_cost + back < row[column]:
+                            row[column] = new_cost + back
+                            heapq.heappush(gaps, (radii[column] - row[column], column))
+        rows.append(row)
+    return rows
+
+
+def _make_arrays(offsets, targets, weights):
+    adjacency = AdjacencyArrays()
+    adjacency.offsets = offsets
+    adjacency.targets = targets
+    adjacency.weights = weights
+    return adjacency
+
+
+def _init_matrix_worker(offsets, targets, weights, rev_offsets, rev_targets, rev_weights):
+    global _worker_adjacency, _worker_reverse
+    _worker_adjacency = _make_arrays(offsets, targets, weights)
+    _worker_reverse = _make_arrays(rev_offsets, rev_targets, rev_weights)
+
+
+def _matrix_buckets(columns, origins):
+    return _fill_buckets(_worker_adjacency, _worker_reverse, columns, origins)
+
+
+def _matrix_rows(sources, buckets, radii, dest_labels):
+    return _bucket_rows(_worker_adjacency, sources, buckets, radii, dest_labels)
@@ -0,0 +1,158 @@
+import cProfile
+import json
+import time
+import tracemalloc
+
+
+class CommandProfiler:
+    """
+    This class times the commands run by the NC Routes driver.
+    Each command is split into spans: parse (reading the command),
+    compute (the graph algorithm) and render (building the output
+    text, which is whatever time is left over).  tracemalloc tracks
+    the memory each command allocates, and chosen commands can be
+    run under cProfile as well.
+    Every command produces one JSON line in the output file, and a
+    table of the slowest commands can be printed at the end.
+    While the profiler is disabled, every method does nothing.
+    """
+    def __init__(self):
+        """
+        Create a disabled profiler
+        Instance variables:
+            self.enabled: bool
+            self.writer: file receiving the JSON lines
+            self.cprofile_cmds: set of lower case command names
+                                to run under cProfile
+            self.records: Python list of the finished command records
+            self.current: record of the command being timed
+        """
+        self.enabled = False
+        self.writer = None
+        self.cprofile_cmds = set()
+        self.records = []
+        self.current = None
+        self.profile = None
+        self.snapshot = None
+        self.start_time = 0.0
+        self.start_memory = 0
+
+    def enable(self, output_file, cprofile_cmds=None):
+        """
+        Start profiling, writing JSON lines to output_file
+        """
+        self.enabled = True
+        self.writer = open(output_file, 'w')
+        if cprofile_cmds is not None:
+            self.cprofile_cmds = set(cmd.strip().lower() for cmd in cprofile_cmds)
+        tracemalloc.start()
+
+    def disable(self):
+        """
+        Stop profiling and close the output file
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.writer.close()
+        tracemalloc.stop()
+
+    def start_command(self, cmd_list):
+        """
+        Start timing the command given by its fields
+        """
+        if not self.enabled:
+            return
+        name = cmd_list[0].strip()
+        self.current = {"index": len(self.records),
+                        "command": name.upper(),
+                        "args": [arg.strip() for arg in cmd_list[1:]],
+                        "spans": {"parse": 0.0, "compute": 0.0, "render": 0.0}}
+
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.start_memory = tracemalloc.get_traced_memory()[0]
+
+        if name.lower() in self.cprofile_cmds:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.start_time = time.perf_counter()
+
+    def span(self, name):
+        """
+        Return a context manager adding the time spent
+        inside it to the named span of the current command
+        """
+        return _Span(self, name)
+
+    def end_command(self):
+        """
+        Finish the current command and write its JSON line
+        """
+        if not self.enabled or self.current is None:
+            return
+        total = time.perf_counter() - self.start_time
+        record = self.current
+
+        if self.profile is not None:
+            self.profile.disable()
+            stats_file = "profile_{}_{}.prof".format(record["index"],
+                                                     record["command"].lower())
+            self.profile.dump_stats(stats_file)
+            record["cprofile"] = stats_file
+            self.profile = None
+
+        # The render span is the time not spent parsing or computing
+        spans = record["spans"]
+        spans["render"] = max(0.0, total - spans["parse"] - spans["compute"])
+        record["total"] = total
+
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().compare_to(self.snapshot, 'filename')
+        record["mem_net_bytes"] = current - self.start_memory
+        record["mem_peak_bytes"] = peak - self.start_memory
+        record["alloc_blocks"] = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+        self.snapshot = None
+
+        self.writer.write(json.dumps(record) + "\n")
+        self.records.append(record)
+        self.current = None
+
+    def get_summary_str(self, num_cmds=5):
+        """
+        Return a table of the num_cmds slowest commands
+        """
+        slowest = sorted(self.records, key=lambda record: record["total"],
+                         reverse=True)[:num_cmds]
+
+        summary_str = "Slowest commands:\n"
+        summary_str += "{:<4} {:<30} {:>10} {:>10} {:>10} {:>10} {:>12}\n".format(
+            "#", "Command", "Total ms", "Parse ms", "Compute ms", "Render ms", "Peak KiB")
+        for record in slowest:
+            label = " : ".join([record["command"]] + record["args"])
+            spans = record["spans"]
+            summary_str += "{:<4} {:<30} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f} {:>12.1f}\n".format(
+                record["index"], label[:30], record["total"] * 1000,
+                spans["parse"] * 1000, spans["compute"] * 1000,
+                spans["render"] * 1000, record["mem_peak_bytes"] / 1024)
+        return summary_str
+
+
+class _Span:
+    """
+    Context manager timing one span of a command
+    """
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current = self.profiler.current
+        if self.profiler.enabled and current is not None:
+            spans = current["spans"]
+            spans[self.name] = spans.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
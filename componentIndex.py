@@ -0,0 +1,123 @@
+class ComponentIndex:
+    """
+    This class labels the connected components of a Graph using
+    a union-find (disjoint set) structure over the vertex indices.
+    Roads are treated as two-way, so two vertices share a component
+    when some chain of edges joins them in either direction.
+    The index is kept up to date as vertices and edges are added,
+    so asking whether two vertices share a component is O(1)
+    (amortized).
+    """
+    def __init__(self, size=0):
+        """
+        Create an index of size single vertex components
+        Instance variables:
+            self.parents: Python list of parent indices in the set forest
+            self.sizes: Python list of component sizes, valid at the roots
+            self.num_components: int
+            self.read_only: bool: True when finds must not shorten paths
+        """
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+        self.num_components = size
+        self.read_only = False
+
+    def add_vertex(self):
+        """
+        Add a new vertex in a component of its own
+        and return its index
+        """
+        index = len(self.parents)
+        self.parents.append(index)
+        self.sizes.append(1)
+        self.num_components += 1
+        return index
+
+    def copy(self):
+        """
+        Return an independent copy of the index
+        """
+        other = ComponentIndex()
+        other.parents = list(self.parents)
+        other.sizes = list(self.sizes)
+        other.num_components = self.num_components
+        return other
+
+    def compress(self):
+        """
+        Point every vertex straight at its component label, so
+        later finds only read the lists (they may then be shared
+        between threads)
+        """
+        for index in range(len(self.parents)):
+            self.parents[index] = self.find(index)
+
+    def set_read_only(self):
+        """
+        Stop finds from changing the parents list, so the index can
+        be shared between threads.  Union by size keeps every path
+        at most log2(size) long, so finds stay fast uncompressed
+        """
+        self.read_only = True
+
+    def find(self, index):
+        """
+        Return the label (root index) of the component
+        holding the vertex at index
+        """
+        parents = self.parents
+        if self.read_only:
+            while parents[index] != index:
+                index = parents[index]
+            return index
+        while parents[index] != index:
+            # Path halving: point every other vertex at its grandparent
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    def union(self, index1, index2):
+        """
+        Join the components of the two vertices,
+        returning True if they were separate
+        """
+        root1 = self.find(index1)
+        root2 = self.find(index2)
+        if root1 == root2:
+            return False
+
+        # Hang the smaller component under the larger one
+        if self.sizes[root1] < self.sizes[root2]:
+            root1, root2 = root2, root1
+        self.parents[root2] = root1
+        self.sizes[root1] += self.sizes[root2]
+        self.num_components -= 1
+        return True
+
+    def same_component(self, index1, index2):
+        """
+        Return True if both vertices are in the same component
+        """
+        return self.find(index1) == self.find(index2)
+
+    def get_component_size(self, index):
+        """
+        Return the number of vertices in the component of index
+        """
+        return self.sizes[self.find(index)]
+
+    def get_num_components(self):
+        """
+        Return the number of components
+        """
+        return self.num_components
+
+    def get_components(self):
+        """
+        Return a list of components, each a list of vertex indices,
+        ordered by the lowest index they hold
+        """
+        components = {}
+        for index in range(len(self.parents)):
+            components.setdefault(self.find(index), []).append(index)
+        return list(components.values())
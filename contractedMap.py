@@ -0,0 +1,246 @@
+import sys
+
+from cityRoadMap import CityRoadMap
+from comparable import Comparable
+from edge import Edge
+from graphTree import GraphTree
+
+"""
+Degree-2 chain contraction.
+
+A pass-through City has Roads to and from exactly two other Cities
+and to nowhere else.  A run of them between two junctions (every
+other City) is replaced by one ChainRoad from junction to junction,
+weighing as much as the Roads it stands for and remembering them.
+Searches then run on the map of junctions and ChainRoads only, and
+a route is turned back into Roads (and Cities) when it is output.
+A loop made only of pass-through Cities keeps its first City as a
+junction.
+"""
+
+
+class ChainRoad(Edge, Comparable):
+    """
+    This class stands for the Roads along a chain of pass-through
+    Cities, from one junction to the next
+    Instance variables:
+        self.roads: Python list of the Roads, in travel order
+        self.cities: Python list of the pass-through Cities
+    """
+    def __init__(self, roads):
+        """
+        Create the ChainRoad for the Roads of a chain
+        """
+        weight = 0
+        for road in roads:
+            weight += road.get_weight()
+        super().__init__(roads[0].from_vertex, roads[-1].to_vertex, weight)
+        self.roads = roads
+        self.cities = [road.to_vertex for road in roads[:-1]]
+
+    def get_distance(self):
+        """
+        Return the total distance of the Roads
+        """
+        return self.weight
+
+    def get_roads(self):
+        """
+        Return the list of Roads along the chain
+        """
+        return self.roads
+
+    def get_cities(self):
+        """
+        Return the list of pass-through Cities
+        """
+        return self.cities
+
+    def __str__(self):
+        """
+        Return chain information as a string
+        """
+        return (self.from_vertex.name + " to " + self.to_vertex.name + " through "
+                + str(len(self.cities)) + " cities for " + str(round(self.weight, 2)) + " miles")
+
+
+class ContractedMap(CityRoadMap):
+    """
+    This class is the map of the junctions of a CityRoadMap, joined
+    by its Roads and ChainRoads.  Any City of the original map can
+    start or end a route.  It is read-only: add_vertex, add_edge
+    and add_road raise TypeError
+    """
+    def __init__(self, city_road_map):
+        """
+        Contract the chains of city_road_map
+        Instance variables (besides those of CityRoadMap):
+            self.original: CityRoadMap contracted
+            self.chain_places: Python dictionary holding, for each
+                               pass-through City name, a list of
+                               (ChainRoad, position among its Cities)
+        """
+        self.original = city_road_map
+        adjacency = city_road_map.get_adjacency_arrays()
+        reverse = adjacency.reverse()
+        vertices = city_road_map.get_vertices()
+        size = len(vertices)
+
+        junction = [not self._is_passing(adjacency, reverse, index) for index in range(size)]
+        covered = list(junction)
+
+        chains = []
+        for index in range(size):
+            if junction[index]:
+                chains.extend(self._walk_from(adjacency, junction, covered, index))
+
+        # A loop of pass-through Cities has no junction: make one
+        for index in range(size):
+            if not covered[index]:
+                junction[index] = True
+                covered[index] = True
+                chains.extend(self._walk_from(adjacency, junction, covered, index))
+
+        super().__init__([vertices[index] for index in range(size) if junction[index]], [])
+        for chain in chains:
+            CityRoadMap.add_edge(self, chain)
+
+        self.chain_places = {}
+        for chain in chains:
+            if isinstance(chain, ChainRoad):
+                for pos, city in enumerate(chain.get_cities()):
+                    self.chain_places.setdefault(city.get_name(), []).append((chain, pos))
+
+    def _is_passing(self, adjacency, reverse, index):
+        """
+        Return True when the City at index has one Road to and one
+        Road from each of exactly two other Cities, and no others
+        """
+        out_targets = adjacency.targets[adjacency.offsets[index]:adjacency.offsets[index + 1]]
+        in_targets = reverse.targets[reverse.offsets[index]:reverse.offsets[index + 1]]
+        return (len(out_targets) == 2 and len(in_targets) == 2 and index not in out_targets
+                and out_targets[0] != out_targets[1] and sorted(out_targets) == sorted(in_targets))
+
+    def _walk_from(self, adjacency, junction, covered, start):
+        """
+        Return the edges leaving the junction at start: each Road is
+        followed through pass-through Cities to the next junction, and
+        the Roads passed become one ChainRoad
+        """
+        edges = []
+        for pos in range(adjacency.offsets[start], adjacency.offsets[start + 1]):
+            roads = [adjacency.edges[pos]]
+            prev = start
+            index = adjacency.targets[pos]
+            while not junction[index]:
+                covered[index] = True
+                # Leave by the Road not going back
+                for next_pos in range(adjacency.offsets[index], adjacency.offsets[index + 1]):
+                    if adjacency.targets[next_pos] != prev:
+                        break
+                roads.append(adjacency.edges[next_pos])
+                prev = index
+                index = adjacency.targets[next_pos]
+            if len(roads) == 1:
+                edges.append(roads[0])
+            else:
+                edges.append(ChainRoad(roads))
+        return edges
+
+    def add_vertex(self, city):
+        raise TypeError("A ContractedMap cannot be changed: change the original map")
+
+    def add_edge(self, edge):
+        raise TypeError("A ContractedMap cannot be changed: change the original map")
+
+    def add_road(self, from_city, to_city):
+        raise TypeError("A ContractedMap cannot be changed: change the original map")
+
+    def get_num_passing(self):
+        """
+        Return the number of pass-through Cities contracted away
+        """
+        return len(self.chain_places)
+
+    def _get_ends(self, city, leaving):
+        """
+        Return the junctions a route leaving (or reaching) city can
+        use, as a list of (junction index, Roads between city and
+        the junction in travel order, their cost)
+        """
+        name = city.get_name()
+        if name in self.vert_dict:
+            return [(self.vert_dict[name], [], 0)]
+
+        ends = []
+        for chain, pos in self.chain_places[name]:
+            if leaving:
+                roads = chain.get_roads()[pos + 1:]
+                end = chain.to_vertex
+            else:
+                roads = chain.get_roads()[:pos + 1]
+                end = chain.from_vertex
+            cost = 0
+            for road in roads:
+                cost += road.get_weight()
+            ends.append((self.vert_dict[end.get_name()], roads, cost))
+        return ends
+
+    def get_route(self, source_city, dest_city):
+        """
+        Return the shortest route from source_city to dest_city
+        (Cities of the original map) as a tuple (total cost, list
+        of Roads), or (sys.maxsize, None) when unreachable.
+        The search only visits junctions
+        """
+        if source_city.get_name() == dest_city.get_name():
+            return 0, []
+
+        adjacency = self.get_adjacency_arrays()
+        starts = self._get_ends(source_city, True)
+        finishes = self._get_ends(dest_city, False)
+
+        # Both on one chain: the direct way along it
+        best_cost = sys.maxsize
+        best_roads = None
+        for chain, pos in self.chain_places.get(source_city.get_name(), []):
+            for other_chain, other_pos in self.chain_places.get(dest_city.get_name(), []):
+                if other_chain is chain and other_pos > pos:
+                    roads = chain.get_roads()[pos + 1:other_pos + 1]
+                    cost = 0
+                    for road in roads:
+                        cost += road.get_weight()
+                    if cost < best_cost:
+                        best_cost = cost
+                        best_roads = roads
+
+        # One search over the junctions, from every start end
+        cost, start, finish, path = adjacency.multi_source_path(
+            [(index, start_cost) for index, roads, start_cost in starts],
+            [(index, finish_cost) for index, roads, finish_cost in finishes], best_cost)
+        if path is None:
+            return best_cost, best_roads
+
+        roads = list(starts[start][1])
+        for pos in path:
+            edge = adjacency.edges[pos]
+            if isinstance(edge, ChainRoad):
+                roads.extend(edge.get_roads())
+            else:
+                roads.append(edge)
+        return cost, roads + finishes[finish][1]
+
+    def get_path_str(self, source_city, dest_city):
+        """
+        Return a string holding the City by City shortest path
+        from source_city to dest_city, laid out like the paths of
+        a GraphTree, or None when unreachable
+        """
+        cost, roads = self.get_route(source_city, dest_city)
+        if roads is None:
+            return None
+
+        # The path as a GraphTree of the Cities along it
+        path = [source_city] + [road.to_vertex for road in roads]
+        parents = [None] + path[:-1]
+        return GraphTree(source_city, path, parents, path).get_path_str(dest_city)
@@ -0,0 +1,234 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
+import sys
+
+from edge import Edge
+from graphTree import SparseList
+from sharedArrays import SharedArrays
+from shortestPathTree import ShortestPathTree
+
+"""
+Delta-stepping single source shortest paths (Meyer and Sanders).
+
+Vertices wait in buckets of width delta by their tentative cost.
+The lowest bucket is emptied by relaxing the light edges (weight at
+most delta) of its vertices, which can only refill the same bucket,
+until it stays empty; then the heavy edges of every vertex it held
+are relaxed once.  All the vertices of a bucket are relaxed together,
+so the work of one phase can be split up:
+ 1. The adjacency arrays and the cost array live in shared memory.
+ 2. Worker processes each take a slice of the phase's vertices,
+    read their costs and edges straight from shared memory and send
+    back the relaxations that would lower a cost.
+ 3. The calling process applies those requests and moves the
+    vertices between buckets; only it ever writes the costs.
+"""
+
+# Phases with fewer vertices than this are relaxed in-process
+MIN_PARALLEL_VERTICES = 2048
+
+# Shared arrays of the worker processes
+_worker_shared = None
+_worker_arrays = None
+
+
+class DeltaStepping:
+    """
+    This class runs delta-stepping searches over a Graph.  Its
+    results match get_shortest_path: the same costs, the same
+    parents and the same search order
+    """
+    def __init__(self, graph, delta=None, workers=None, layer=None):
+        """
+        Copy the adjacency arrays of graph into shared memory and,
+        when workers (os.cpu_count() when None) is more than 1,
+        start the worker processes.  delta defaults to the mean
+        edge weight.  Edges are weighed with the named weight
+        layer, if given.  Call close() when done
+        Instance variables:
+            self.graph: Graph searched
+            self.layer: str: name of the weight layer, or None
+            self.delta: float: bucket width
+            self.workers: int
+            self.shared: SharedArrays holding the arrays below
+            self.offsets, self.targets, self.weights, self.cost:
+                memoryviews over the shared memory
+            self.executor: ProcessPoolExecutor, or None
+        """
+        adjacency = graph.get_adjacency_arrays(layer)
+        if delta is None:
+            num_edges = max(adjacency.get_num_edges(), 1)
+            delta = sum(adjacency.weights) / num_edges or 1.0
+        if delta <= 0:
+            raise ValueError("delta must be positive")
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        self.graph = graph
+        self.layer = layer
+        self.delta = delta
+        self.workers = workers
+        self.shared = SharedArrays()
+        self.offsets = self.shared.add(adjacency.offsets)
+        self.targets = self.shared.add(adjacency.targets)
+        self.weights = self.shared.add(adjacency.weights)
+        self.cost = self.shared.add(array('d', [0.0]) * adjacency.get_size())
+
+        self.executor = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(self.shared.get_specs(),))
+
+    def _views(self):
+        return (self.offsets, self.targets, self.weights, self.cost)
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def search(self, source):
+        """
+        Return the list of costs from the vertex index source
+        (sys.maxsize when unreachable)
+        """
+        inf = float("inf")
+        cost = self.cost
+        delta = self.delta
+        for i in range(len(cost)):
+            cost[i] = inf
+        cost[source] = 0.0
+
+        buckets = {0: {source}}
+        while buckets:
+            bucket_num = min(buckets)
+            settled = set()
+            # Light edges can refill the bucket: repeat until it stays empty
+            while bucket_num in buckets:
+                frontier = buckets.pop(bucket_num)
+                settled |= frontier
+                self._apply(self._relax(list(frontier), True), buckets)
+            self._apply(self._relax(list(settled), False), buckets)
+
+        result = [sys.maxsize if value == inf else value for value in cost]
+        result[source] = 0
+        return result
+
+    def _relax(self, vertices, light):
+        """
+        Return the (vertex, cost) relaxation requests of the light
+        or heavy edges leaving vertices, split over the workers
+        """
+        if self.executor is None or len(vertices) < MIN_PARALLEL_VERTICES:
+            return _relax_requests(self._views(), vertices, light, self.delta)
+
+        chunk_size = (len(vertices) + self.workers - 1) // self.workers
+        chunks = [vertices[i:i + chunk_size] for i in range(0, len(vertices), chunk_size)]
+        requests = []
+        for chunk_requests in self.executor.map(_relax_chunk, chunks,
+                                                [light] * len(chunks),
+                                                [self.delta] * len(chunks)):
+            requests.extend(chunk_requests)
+        return requests
+
+    def _apply(self, requests, buckets):
+        """
+        Lower the costs the requests improve and
+        move those vertices to their new buckets
+        """
+        cost = self.cost
+        delta = self.delta
+        for index, new_cost in requests:
+            old_cost = cost[index]
+            if new_cost < old_cost:
+                if old_cost != float("inf"):
+                    # The old bucket may be the one being emptied
+                    old_num = int(old_cost // delta)
+                    old_bucket = buckets.get(old_num)
+                    if old_bucket is not None:
+                        old_bucket.discard(index)
+                        if not old_bucket:
+                            del buckets[old_num]
+                cost[index] = new_cost
+                buckets.setdefault(int(new_cost // delta), set()).add(index)
+
+    def get_shortest_path(self, source_vertex):
+        """
+        Return the ShortestPathTree for source_vertex, the same
+        tree Graph.get_shortest_path builds
+        """
+        graph = self.graph
+        vertices = graph.get_vertices()
+        source = graph.get_vert_index(source_vertex)
+        final_cost = self.search(source)
+
+        # Replay the order get_shortest_path settles the vertices in:
+        # the cheapest vertex reached, lowest index first among equal
+        # costs.  A vertex is reached when a settled vertex leads to
+        # it at its final cost, and the first one to do so is its
+        # parent.  With the final costs known no cost ever has to be
+        # lowered, so only vertices at their final cost enter the heap.
+        # Costs are added up again from the graph's own weights, so
+        # they keep its number type
+        cost = {source: 0}
+        parents = {}
+        search_order = []
+        edges = []
+        heap = [(0, source)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            search_order.append(vertices[index])
+            if index != source:
+                edges.append(Edge(parents[index], vertices[index], dist))
+
+            for target, weight in graph._out_edges(index, self.layer):
+                new_cost = dist + weight
+                if target not in cost and new_cost == final_cost[target]:
+                    cost[target] = new_cost
+                    parents[target] = vertices[index]
+                    heapq.heappush(heap, (new_cost, target))
+
+        size = len(vertices)
+        return ShortestPathTree(source_vertex, search_order, SparseList(size, parents),
+                                vertices, edges, SparseList(size, cost, sys.maxsize))
+
+
+def _relax_requests(views, vertices, light, delta):
+    """
+    Return the (vertex, cost) pairs that relaxing the light (or
+    heavy) edges leaving vertices would improve
+    """
+    offsets, targets, weights, cost = views
+    requests = []
+    for index in vertices:
+        base = cost[index]
+        for pos in range(offsets[index], offsets[index + 1]):
+            weight = weights[pos]
+            if (weight <= delta) == light:
+                new_cost = base + weight
+                if new_cost < cost[targets[pos]]:
+                    requests.append((targets[pos], new_cost))
+    return requests
+
+
+def _init_worker(specs):
+    global _worker_shared, _worker_arrays
+    _worker_shared = SharedArrays.attach(specs)
+    _worker_arrays = tuple(_worker_shared.views)
+
+
+def _relax_chunk(vertices, light, delta):
+    return _relax_requests(_worker_arrays, vertices, light, delta)
@@ -0,0 +1,423 @@
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+import heapq
+import math
+import mmap
+import os
+import sys
+
+"""
+On disk layout of a DiskGraph stored under a path prefix:
+
+  prefix.idx:   int64 values: number of vertices, weight scale, then
+                one byte offset per vertex plus one into prefix.adj
+  prefix.adj:   the edges of each vertex, back to back; each edge is
+                two varints: the zigzag encoded difference between its
+                neighbor index and the previous neighbor index of the
+                same vertex, then its weight times the scale, rounded
+  prefix.names: the vertex names, one per line
+  prefix.nix:   int64 values: one byte offset per vertex plus one into
+                prefix.names, then the vertex indices in order of name
+                (compared as UTF-8 bytes), so a name is found by binary
+                search without reading in every name
+
+Neighbors keep the order of the original adjacency lists, so searches
+over the DiskGraph visit vertices in the same order as the Graph.
+"""
+
+IDX_SUFFIX = ".idx"
+ADJ_SUFFIX = ".adj"
+NAMES_SUFFIX = ".names"
+NAME_INDEX_SUFFIX = ".nix"
+
+# Weights are stored as whole numbers of 1 / WEIGHT_SCALE
+WEIGHT_SCALE = 1000000
+
+
+def encode_varint(value, out):
+    """
+    Append the unsigned varint encoding of value to the bytearray out
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """
+    Return the unsigned varint starting at data[pos]
+    and the position just after it
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    """
+    Map a signed int onto an unsigned one, small magnitudes first
+    """
+    if value < 0:
+        return -2 * value - 1
+    return 2 * value
+
+
+def unzigzag(value):
+    """
+    Undo zigzag
+    """
+    if value & 1:
+        return -(value + 1) // 2
+    return value // 2
+
+
+def map_file(file):
+    """
+    Return a read only mmap of the open file, or empty bytes
+    for an empty file (which cannot be mapped)
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Costs(Sequence):
+    """
+    This class is the cost list of a DiskGraph search: it reads
+    from an array of floats, where unreached vertices hold infinity,
+    and gives sys.maxsize for them like the cost list of a Graph
+    """
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, index):
+        value = self.values[index]
+        if value == math.inf:
+            return sys.maxsize
+        return value
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        for value in self.values:
+            if value == math.inf:
+                yield sys.maxsize
+            else:
+                yield value
+
+
+class DiskGraphWriter:
+    """
+    This class writes the files of a DiskGraph one vertex at a time,
+    so a map never has to be held in memory all at once.
+    Vertices must be added in index order.
+    """
+    def __init__(self, prefix, scale=WEIGHT_SCALE):
+        """
+        Open the files for writing
+        Instance variables:
+            self.prefix: str
+            self.scale: int
+            self.offsets: array of int, byte offsets written so far
+            self.name_offsets: array of int, the same into the names
+        """
+        self.prefix = prefix
+        self.scale = scale
+        self.offsets = array('q', [0])
+        self.name_offsets = array('q', [0])
+        self.adj_file = open(prefix + ADJ_SUFFIX, 'wb')
+        self.names_file = open(prefix + NAMES_SUFFIX, 'wb')
+
+    def add_vertex(self, name, targets, weights):
+        """
+        Write the next vertex with its neighbor indices and weights
+        """
+        record = bytearray()
+        prev = 0
+        for target, weight in zip(targets, weights):
+            encode_varint(zigzag(target - prev), record)
+            encode_varint(int(round(weight * self.scale)), record)
+            prev = target
+        self.adj_file.write(record)
+        self.offsets.append(self.offsets[-1] + len(record))
+        line = (str(name) + "\n").encode('utf-8')
+        self.names_file.write(line)
+        self.name_offsets.append(self.name_offsets[-1] + len(line))
+
+    def close(self):
+        """
+        Write the index files and close everything
+        """
+        self.adj_file.close()
+        self.names_file.close()
+        size = len(self.offsets) - 1
+        header = array('q', [size, self.scale])
+        with open(self.prefix + IDX_SUFFIX, 'wb') as idx_file:
+            header.tofile(idx_file)
+            self.offsets.tofile(idx_file)
+
+        # Sort the vertices by name, reading the names back from disk
+        name_offsets = self.name_offsets
+        with open(self.prefix + NAMES_SUFFIX, 'rb') as names_file:
+            names = map_file(names_file)
+            order = array('q', sorted(
+                range(size), key=lambda index: names[name_offsets[index]:
+                                                     name_offsets[index + 1] - 1]))
+            if isinstance(names, mmap.mmap):
+                names.close()
+        with open(self.prefix + NAME_INDEX_SUFFIX, 'wb') as name_index_file:
+            name_offsets.tofile(name_index_file)
+            order.tofile(name_index_file)
+
+
+class DiskGraph:
+    """
+    This class is a read only graph whose adjacency lives in
+    memory mapped files (see the layout above).  The operating
+    system pages the files in as they are touched, and the decoded
+    adjacency of recently used vertices is kept in a small LRU page
+    cache, so resident memory stays bounded by the cache size plus
+    the per search lists of one entry per vertex.
+    Vertices are identified by their index.
+    """
+    def __init__(self, prefix, cache_size=4096):
+        """
+        Map the files stored under prefix
+        Instance variables:
+            self.size: int: number of vertices
+            self.scale: int: weight scale
+            self.offsets: memoryview of int64 byte offsets (no copy)
+            self.adj: mmap of the edge records
+            self.cache: OrderedDict of vertex index to decoded edges
+            self.cache_size: int
+            self.names: mmap of the vertex names
+            self.name_offsets: memoryview of int64 byte offsets into names
+            self.name_order: memoryview of int64 vertex indices,
+                             in order of name
+        """
+        self.prefix = prefix
+        self.idx_file = open(prefix + IDX_SUFFIX, 'rb')
+        self.idx_map = mmap.mmap(self.idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = memoryview(self.idx_map).cast('q')
+        self.size = index[0]
+        self.scale = index[1]
+        self.offsets = index[2:]
+
+        self.adj_file = open(prefix + ADJ_SUFFIX, 'rb')
+        self.adj = map_file(self.adj_file)
+
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+        self.names_file = open(prefix + NAMES_SUFFIX, 'rb')
+        self.names = map_file(self.names_file)
+        self.name_index_file = open(prefix + NAME_INDEX_SUFFIX, 'rb')
+        self.name_index_map = mmap.mmap(self.name_index_file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+        name_index = memoryview(self.name_index_map).cast('q')
+        self.name_offsets = name_index[:self.size + 1]
+        self.name_order = name_index[self.size + 1:]
+
+    @staticmethod
+    def create(graph, prefix, scale=WEIGHT_SCALE):
+        """
+        Write the files for an in memory Graph under prefix
+        and return the DiskGraph reading them
+        """
+        adjacency = graph.get_adjacency_arrays()
+        writer = DiskGraphWriter(prefix, scale)
+        for index, vertex in enumerate(graph.get_vertices()):
+            start = adjacency.offsets[index]
+            end = adjacency.offsets[index + 1]
+            writer.add_vertex(vertex.get_name(), adjacency.targets[start:end],
+                              adjacency.weights[start:end])
+        writer.close()
+        return DiskGraph(prefix)
+
+    def close(self):
+        """
+        Release the memory maps and files
+        """
+        self.cache.clear()
+        self.offsets.release()
+        self.offsets = None
+        self.name_offsets.release()
+        self.name_order.release()
+        self.name_offsets = None
+        self.name_order = None
+        for data in (self.adj, self.names):
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self.idx_map.close()
+        self.name_index_map.close()
+        self.idx_file.close()
+        self.adj_file.close()
+        self.names_file.close()
+        self.name_index_file.close()
+
+    def get_size(self):
+        """
+        Return the number of vertices
+        """
+        return self.size
+
+    def get_names(self):
+        """
+        Return the list of all the vertex names
+        """
+        return [self.get_name(index) for index in range(self.size)]
+
+    def _get_name_bytes(self, index):
+        """
+        Return the UTF-8 bytes of the name of the vertex at index
+        """
+        return self.names[self.name_offsets[index]:self.name_offsets[index + 1] - 1]
+
+    def get_name(self, index):
+        """
+        Return the name of the vertex at index
+        """
+        return self._get_name_bytes(index).decode('utf-8')
+
+    def get_vert_index(self, name):
+        """
+        Return the index of the vertex with the given name, found by
+        binary search over the name order; with duplicate names, the
+        first vertex of that name
+        """
+        key = name.encode('utf-8')
+        low = 0
+        high = self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self._get_name_bytes(self.name_order[mid]) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == self.size or self._get_name_bytes(self.name_order[low]) != key:
+            raise ValueError(repr(name) + " is not a vertex")
+        return self.name_order[low]
+
+    def get_neighbors(self, index):
+        """
+        Return a list of (neighbor index, weight) tuples
+        for the vertex at index
+        """
+        edges = self.cache.get(index)
+        if edges is not None:
+            self.cache.move_to_end(index)
+            return edges
+
+        edges = self.decode(index)
+        self.cache[index] = edges
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return edges
+
+    def decode(self, index):
+        """
+        Decode the edge record of the vertex at index
+        """
+        data = self.adj
+        pos = self.offsets[index]
+        end = self.offsets[index + 1]
+        edges = []
+        prev = 0
+        while pos < end:
+            delta, pos = decode_varint(data, pos)
+            weight, pos = decode_varint(data, pos)
+            prev += unzigzag(delta)
+            edges.append((prev, weight / self.scale))
+        return edges
+
+    def df_search(self, source):
+        """
+        Return the search order and list of parent indices (-1 for
+        none) of a depth-first search from the source index.
+        An explicit stack takes the place of recursion so deep maps
+        do not overflow; the visit order matches Graph.df_search
+        """
+        parents = array('l', [-1]) * self.size
+        has_visited = bytearray(self.size)
+        search_order = [source]
+        has_visited[source] = 1
+
+        # Each stack entry is a vertex and the next edge to look at
+        stack = [(source, 0)]
+        while stack:
+            vertex, pos = stack.pop()
+            edges = self.get_neighbors(vertex)
+            while pos < len(edges):
+                neighbor = edges[pos][0]
+                pos += 1
+                if not has_visited[neighbor]:
+                    has_visited[neighbor] = 1
+                    parents[neighbor] = vertex
+                    search_order.append(neighbor)
+                    stack.append((vertex, pos))
+                    stack.append((neighbor, 0))
+                    break
+
+        return search_order, parents
+
+    def bf_search(self, source):
+        """
+        Return the search order and list of parent indices (-1 for
+        none) of a breadth-first search from the source index
+        """
+        parents = array('l', [-1]) * self.size
+        has_visited = bytearray(self.size)
+        has_visited[source] = 1
+
+        # The search order doubles as the queue
+        search_order = [source]
+        head = 0
+        while head < len(search_order):
+            vertex = search_order[head]
+            head += 1
+            for neighbor, weight in self.get_neighbors(vertex):
+                if not has_visited[neighbor]:
+                    has_visited[neighbor] = 1
+                    parents[neighbor] = vertex
+                    search_order.append(neighbor)
+
+        return search_order, parents
+
+    def get_shortest_path(self, source):
+        """
+        Return the search order, cost list (sys.maxsize when not
+        reached) and list of parent indices of a Dijkstra search
+        from the source index.  The costs are kept in an array of
+        floats, infinity until reached; the Costs returned read it
+        """
+        cost = array('d', [math.inf]) * self.size
+        parents = array('l', [-1]) * self.size
+        settled = bytearray(self.size)
+        search_order = []
+        cost[source] = 0
+
+        heap = [(0, source)]
+        while heap:
+            dist, vertex = heapq.heappop(heap)
+            if settled[vertex]:
+                continue
+            settled[vertex] = 1
+            search_order.append(vertex)
+
+            for neighbor, weight in self.get_neighbors(vertex):
+                new_cost = dist + weight
+                if not settled[neighbor] and new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
+                    parents[neighbor] = vertex
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        return search_order, Costs(cost), parents
@@ -0,0 +1,461 @@
+from array import array
+import bisect
+from collections.abc import Mapping
+from itertools import chain
+from types import MappingProxyType
+
+from adjacencyArrays import AdjacencyArrays
+from cityRoadMap import CityRoadMap
+from road import Road
+from roadLink import link_road
+
+"""
+Immutable CityRoadMap snapshots.
+
+A FrozenCityRoadMap keeps every container as a tuple or a read-only
+mapping, and never changes what it shares.  Queries only read shared
+state; their scratch space comes from the per-thread SearchWorkspace,
+so any number of threads can query one snapshot without locks.
+
+Changes go through a MapBuilder, which publishes a new snapshot that
+shares everything unchanged with the old one:
+    - the adjacency arrays are kept in blocks of BLOCK_SIZE vertices;
+      only the blocks holding changed vertices are rebuilt, the rest
+      are shared by reference
+    - the name index is a LayeredMapping: new names go in a small
+      dictionary on top of a shared base
+    - the vertices tuple, population index and ComponentIndex are
+      shared as they are when no City is added and no components
+      are joined
+so publishing Roads costs O(BLOCK_SIZE + Roads of the changed
+blocks), plus O(V / BLOCK_SIZE) to copy the list of blocks.
+Adding Cities also copies the vertices tuple and the population
+lists, and joining two components copies the ComponentIndex lists:
+these are still O(V), but flat C-level copies of references with no
+Python work per vertex.  The name index is merged into a new base
+once LayeredMapping.TOP_LIMIT names have been added on top of it.
+The flat AdjacencyArrays the searches use are joined from the blocks
+by the first query that needs them: bulk array copies plus one pass
+shifting the offsets, so O(V + E) once per snapshot queried.
+The Cities and Roads themselves are shared, not copied: they must
+not be changed (set_weight) while a snapshot holding them is in use.
+"""
+
+BLOCK_SIZE = 1024
+
+
+class LayeredMapping(Mapping):
+    """
+    This class is a read-only mapping made of a base dictionary,
+    shared between versions and never changed, and a small
+    dictionary of the entries added on top of it
+    Instance variables:
+        self.base: Python dictionary
+        self.top: Python dictionary
+    """
+    TOP_LIMIT = 1024
+
+    def __init__(self, base, top=None):
+        if top is None:
+            top = {}
+        self.base = base
+        self.top = top
+
+    def with_entries(self, entries):
+        """
+        Return a new LayeredMapping holding these entries as well,
+        sharing the base; the entries on top are merged into a new
+        base once there are more than TOP_LIMIT of them
+        """
+        top = dict(self.top)
+        top.update(entries)
+        if len(top) <= self.TOP_LIMIT:
+            return LayeredMapping(self.base, top)
+        base = dict(self.base)
+        base.update(top)
+        return LayeredMapping(base)
+
+    def __getitem__(self, key):
+        base = self.base
+        if key in base:
+            return base[key]
+        return self.top[key]
+
+    def __contains__(self, key):
+        return key in self.base or key in self.top
+
+    def __iter__(self):
+        return chain(self.base, self.top)
+
+    def __len__(self):
+        return len(self.base) + len(self.top)
+
+
+class RoadsByName(Mapping):
+    """
+    This class is the read-only neighbors_dict of a snapshot: it
+    gives the tuple of Roads leaving each City, read from the
+    adjacency blocks
+    Instance variables:
+        self.vert_dict: mapping of City indices, keyed by name
+        self.blocks: Python tuple of the AdjacencyArrays blocks
+    """
+    def __init__(self, vert_dict, blocks):
+        self.vert_dict = vert_dict
+        self.blocks = blocks
+
+    def __getitem__(self, name):
+        index = self.vert_dict[name]
+        block = self.blocks[index // BLOCK_SIZE]
+        local = index % BLOCK_SIZE
+        return tuple(block.edges[block.offsets[local]:block.offsets[local + 1]])
+
+    def __iter__(self):
+        return iter(self.vert_dict)
+
+    def __len__(self):
+        return len(self.vert_dict)
+
+
+def make_block(offsets, targets, weights, edges, layer_weights):
+    """
+    Return the AdjacencyArrays block of a run of vertices: offsets
+    start at 0 and targets are indices in the whole map.  A layer's
+    scale is infinity when the block has no edge to take it from
+    """
+    block = AdjacencyArrays()
+    block.offsets = offsets
+    block.targets = targets
+    block.weights = weights
+    block.edges = edges
+    for name, layer in layer_weights.items():
+        ratios = [weight / base_weight for weight, base_weight in zip(layer, weights)
+                  if base_weight > 0]
+        block.add_layer(name, layer, min(ratios, default=float("inf")))
+    return block
+
+
+def split_blocks(adjacency, layer_names):
+    """
+    Return the AdjacencyArrays cut into blocks of BLOCK_SIZE
+    vertices, as a tuple
+    """
+    blocks = []
+    for first in range(0, adjacency.get_size(), BLOCK_SIZE):
+        end = min(first + BLOCK_SIZE, adjacency.get_size())
+        start_pos = adjacency.offsets[first]
+        end_pos = adjacency.offsets[end]
+        blocks.append(make_block(
+            array('l', [offset - start_pos for offset in adjacency.offsets[first:end + 1]]),
+            adjacency.targets[start_pos:end_pos], adjacency.weights[start_pos:end_pos],
+            adjacency.edges[start_pos:end_pos],
+            {name: adjacency.get_layer(name).weights[start_pos:end_pos] for name in layer_names}))
+    return tuple(blocks)
+
+
+def join_blocks(blocks, layer_names):
+    """
+    Return the flat AdjacencyArrays of the blocks
+    """
+    adjacency = AdjacencyArrays()
+    for block in blocks:
+        # Shift the block's offsets past the edges already joined
+        shift = len(adjacency.targets)
+        adjacency.offsets.extend(array('l', [offset + shift for offset in block.offsets[1:]]))
+        adjacency.targets.extend(block.targets)
+        adjacency.weights.extend(block.weights)
+        adjacency.edges.extend(block.edges)
+
+    for name in layer_names:
+        weights = array('d')
+        scale = float("inf")
+        for block in blocks:
+            layer = block.get_layer(name)
+            weights.extend(layer.weights)
+            scale = min(scale, layer.scale)
+        if scale == float("inf"):
+            scale = 1.0
+        adjacency.add_layer(name, weights, scale)
+    return adjacency
+
+
+class FrozenCityRoadMap(CityRoadMap):
+    """
+    This class is a read-only CityRoadMap.  It answers every query
+    a CityRoadMap does; add_vertex, add_edge and add_road raise
+    TypeError
+    """
+    def __init__(self, vertices, vert_dict, blocks, adjacency, components,
+                 pop_order, pop_keys, undirected=False, weight_layers=None, unpaired=None):
+        """
+        Create a snapshot from parts that are no longer changed
+        (use freeze() or a MapBuilder rather than calling this)
+        Instance variables (besides those of CityRoadMap):
+            self.vertices: Python tuple of Cities
+            self.vert_dict: LayeredMapping of indices
+            self.blocks: Python tuple of AdjacencyArrays, one per
+                         BLOCK_SIZE vertices
+            self.adjacency: AdjacencyArrays joined from the blocks,
+                            or None until a query needs them
+            self.neighbors_dict: RoadsByName, read from the blocks
+            self.pop_order, self.pop_keys: Python tuples
+            self.components: ComponentIndex with read-only finds
+            self.weight_layers, self.unpaired: read-only mappings
+        """
+        if weight_layers is None:
+            weight_layers = {}
+        if unpaired is None:
+            unpaired = {}
+        self.vertices = tuple(vertices)
+        self.vert_dict = vert_dict
+        self.blocks = blocks
+        self.adjacency = adjacency
+        self.neighbors_dict = RoadsByName(vert_dict, blocks)
+        self.components = components
+        self.pop_order = tuple(pop_order)
+        self.pop_keys = tuple(pop_keys)
+        self.undirected = undirected
+        self.unpaired = MappingProxyType(dict(unpaired))
+        self.weight_layers = MappingProxyType(dict(weight_layers))
+
+        # Finds only read the parents list from now on
+        self.components.set_read_only()
+
+    @staticmethod
+    def from_map(city_road_map):
+        """
+        Return a snapshot of a (mutable) CityRoadMap
+        """
+        vertices = city_road_map.get_vertices() or []
+        # The map builds new arrays when it changes rather than
+        # changing these, so the snapshot can share them
+        adjacency = city_road_map.get_adjacency_arrays()
+        components = city_road_map.components.copy()
+        components.compress()
+        return FrozenCityRoadMap(vertices, LayeredMapping(dict(city_road_map.vert_dict)),
+                                 split_blocks(adjacency, city_road_map.weight_layers),
+                                 adjacency, components,
+                                 city_road_map.pop_order, city_road_map.pop_keys,
+                                 city_road_map.undirected, city_road_map.weight_layers,
+                                 city_road_map.unpaired)
+
+    def get_adjacency_arrays(self, layer=None):
+        """
+        Return the AdjacencyArrays (with the weights of the named
+        layer), joining them from the blocks the first time.
+        Threads racing to join them build equal arrays, and
+        either may be kept
+        """
+        adjacency = self.adjacency
+        if adjacency is None:
+            adjacency = join_blocks(self.blocks, self.weight_layers)
+            self.adjacency = adjacency
+        return adjacency.get_layer(layer)
+
+    def add_vertex(self, city):
+        raise TypeError("A FrozenCityRoadMap cannot be changed: use a MapBuilder")
+
+    def add_edge(self, edge):
+        raise TypeError("A FrozenCityRoadMap cannot be changed: use a MapBuilder")
+
+    def add_road(self, from_city, to_city):
+        raise TypeError("A FrozenCityRoadMap cannot be changed: use a MapBuilder")
+
+    def add_weight_layer(self, name, weight_of):
+        raise TypeError("A FrozenCityRoadMap cannot be changed: use a MapBuilder")
+
+    def freeze(self):
+        """
+        A snapshot is already frozen
+        """
+        return self
+
+    def get_builder(self):
+        """
+        Return a MapBuilder for a new version of this snapshot
+        """
+        return MapBuilder(self)
+
+
+class MapBuilder:
+    """
+    This class collects changes to a FrozenCityRoadMap and publishes
+    them as a new snapshot, leaving the old one untouched for the
+    readers still using it
+    """
+    def __init__(self, snapshot):
+        """
+        Start a new version of snapshot
+        Instance variables:
+            self.snapshot: FrozenCityRoadMap the changes apply to
+            self.new_cities: Python list of Cities added
+            self.new_names: Python dictionary of the indices of
+                            the Cities added, keyed by name
+            self.changed: Python dictionary of the new adjacency
+                          lists of changed vertices, keyed by index
+            self.components: ComponentIndex, old and new; the
+                             snapshot's own until a change needs a copy
+            self.components_shared: bool: True while it is the snapshot's
+            self.unpaired: Python dictionary, as in CityRoadMap
+        """
+        self.snapshot = snapshot
+        self.new_cities = []
+        self.new_names = {}
+        self.changed = {}
+        self.components = snapshot.components
+        self.components_shared = True
+        self.unpaired = dict(snapshot.unpaired)
+
+    def get_size(self):
+        """
+        Return the number of Cities in the version being built
+        """
+        return len(self.snapshot.vertices) + len(self.new_cities)
+
+    def get_vert_index(self, city):
+        """
+        Returns the index of the given City in the version being built
+        """
+        index = self.new_names.get(city.get_name())
+        if index is None:
+            index = self.snapshot.vert_dict[city.get_name()]
+        return index
+
+    def get_city(self, name):
+        """
+        Return the City with the given name in the
+        version being built, or None
+        """
+        index = self.new_names.get(name)
+        if index is not None:
+            return self.new_cities[index - len(self.snapshot.vertices)]
+        index = self.snapshot.vert_dict.get(name)
+        if index is None:
+            return None
+        return self.snapshot.vertices[index]
+
+    def _get_components(self):
+        """
+        Return the ComponentIndex to change, copying the snapshot's first
+        """
+        if self.components_shared:
+            self.components = self.components.copy()
+            self.components_shared = False
+        return self.components
+
+    def add_vertex(self, city):
+        """
+        Adds a City
+        """
+        index = self.get_size()
+        self.new_cities.append(city)
+        self.new_names[city.get_name()] = index
+        self.changed[index] = []
+        self._get_components().add_vertex()
+
+    def add_edge(self, road):
+        """
+        Adds a Road; only the from City's adjacency list is copied
+        """
+        from_index = self.get_vert_index(road.from_vertex)
+        to_index = self.get_vert_index(road.to_vertex)
+        if from_index not in self.changed:
+            city = self.snapshot.vertices[from_index]
+            self.changed[from_index] = list(self.snapshot.neighbors_dict[city.get_name()])
+        self.changed[from_index].append(road)
+        if not self.components.same_component(from_index, to_index):
+            self._get_components().union(from_index, to_index)
+
+    def add_road(self, from_city, to_city):
+        """
+        Adds a Road from from_city to to_city and returns it,
+        sharing geometry with its way back when the map is undirected
+        """
+        if not self.snapshot.undirected:
+            road = Road(from_city, to_city)
+        else:
+            road = link_road(self.unpaired, from_city, to_city,
+                             self.get_vert_index(from_city), self.get_vert_index(to_city))
+        self.add_edge(road)
+        return road
+
+    def publish(self):
+        """
+        Return the new FrozenCityRoadMap holding the changes
+        """
+        old = self.snapshot
+        vertices = old.vertices
+        vert_dict = old.vert_dict
+        pop_order = old.pop_order
+        pop_keys = old.pop_keys
+        if self.new_cities:
+            vertices = vertices + tuple(self.new_cities)
+            vert_dict = vert_dict.with_entries(self.new_names)
+            pop_order = list(pop_order)
+            pop_keys = list(pop_keys)
+            for index in range(len(old.vertices), len(vertices)):
+                pos = bisect.bisect_right(pop_keys, vertices[index].get_pop())
+                pop_keys.insert(pos, vertices[index].get_pop())
+                pop_order.insert(pos, index)
+
+        # Rebuild the blocks holding changed vertices, share the rest
+        block_changes = {}
+        for index in self.changed:
+            block_changes.setdefault(index // BLOCK_SIZE, []).append(index)
+        blocks = list(old.blocks)
+        for block_num in sorted(block_changes):
+            block = self._build_block(block_num, sorted(block_changes[block_num]), len(vertices))
+            if block_num < len(blocks):
+                blocks[block_num] = block
+            else:
+                blocks.append(block)
+
+        # Later changes to this builder must not reach the snapshot
+        self.components_shared = True
+        return FrozenCityRoadMap(vertices, vert_dict, tuple(blocks), None, self.components,
+                                 pop_order, pop_keys, old.undirected,
+                                 old.weight_layers, self.unpaired)
+
+    def _build_block(self, block_num, changed, size):
+        """
+        Return the new AdjacencyArrays block block_num, given the
+        sorted indices of its changed vertices: runs of unchanged
+        vertices are sliced from the old block (weight layers
+        included), and changed ones are rebuilt from their Roads
+        """
+        first = block_num * BLOCK_SIZE
+        end = min(first + BLOCK_SIZE, size)
+        weight_layers = self.snapshot.weight_layers
+        old = None
+        if block_num < len(self.snapshot.blocks):
+            old = self.snapshot.blocks[block_num]
+
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('d')
+        edges = []
+        layer_weights = {name: array('d') for name in weight_layers}
+        index = first
+        for changed_index in changed + [end]:
+            if index < changed_index:
+                # The run of unchanged vertices up to changed_index
+                start_pos = old.offsets[index - first]
+                end_pos = old.offsets[changed_index - first]
+                shift = len(targets) - start_pos
+                offsets.extend(array('l', [offset + shift for offset in
+                                           old.offsets[index - first + 1:changed_index - first + 1]]))
+                targets.extend(old.targets[start_pos:end_pos])
+                weights.extend(old.weights[start_pos:end_pos])
+                edges.extend(old.edges[start_pos:end_pos])
+                for name in weight_layers:
+                    layer_weights[name].extend(old.get_layer(name).weights[start_pos:end_pos])
+            if changed_index < end:
+                for road in self.changed[changed_index]:
+                    targets.append(self.get_vert_index(road.to_vertex))
+                    weights.append(road.get_weight())
+                    edges.append(road)
+                    for name, weight_of in weight_layers.items():
+                        layer_weights[name].append(weight_of(road))
+                offsets.append(len(targets))
+            index = changed_index + 1
+        return make_block(offsets, targets, weights, edges, layer_weights)
@@ -1,348 +1,642 @@
-from vertex import Vertex
-from edge import Edge
-from graphTree import GraphTree
-from queue_list import Queue
-from mst import MST
-from shortestPathTree import ShortestPathTree
-import sys
-
-
-class Graph:
-    """
-    This class represents a Graph, which has Vertices and Edges.    
-    The Vertices are stored in a Python list: vertices
-    The Edges are stored in vertex adjacency lists, which are
-    kept in a dictionary where the key is the Vertex name and
-    the adjacency list is the value.  The list contains the Edges.
-    An additional dictionary is kept to retrieve the index 
-    for a Vertex using the Vertex name as the key    
-    """ 
-    def __init__(self, vertices=None, edges=None):        
-        """
-        Creates a new, empty graph
-        Instance variables:
-           self.vertices: Python list
-           self.neighbors_dict: Python dictionary of adj_lists
-           self.vert_dict: Python dictionary of indices
-        """        
-        self.vertices = vertices 
-        self.neighbors_dict = {}
-        self.vert_dict = {}
-
-        if vertices is not None:
-            """ 
-            Traverse vertices list to create two dictionaries:
-            self.neighbors_dict and self.vert_dict
-            where the key is the name of the vertex
-            """
-            for index in range(len(self.vertices)):
-                self.vert_dict[vertices[index].get_name()] = index
-                self.neighbors_dict[vertices[index].get_name()] = []
-            
-            self.create_adj_lists(edges)
-
-    def create_adj_lists(self, edges):
-        """
-        Using given edges, create an adjacency list for each vertex
-        """
-        for edge in edges:
-            self.add_edge(edge) 
-        
-    def add_edge(self, edge): 
-        """
-        Adds a new edge to the graph 
-        """
-        name = edge.from_vertex.get_name()
-        adj_list = self.neighbors_dict[name]
-        adj_list.append(edge)
-        
-    def get_edge(self, from_vert, to_vert): 
-        """
-        Returns the edge in the graph having the supplied vertices
-        """
-        adj_list = self.get_neighbors(from_vert)
-        
-        for edge in adj_list:
-            if edge.to_vertex.get_name() == to_vert.get_name():
-                return edge
-        return None
-    
-    def get_neighbors(self, vertex):
-        """
-        Return the adjacency list for vertex
-        """
-        return self.neighbors_dict[vertex.get_name()] 
-    
-    def get_vertices(self): 
-        """
-        Returns the list of all vertices in the graph. 
-        """
-        return self.vertices 
-           
-    def get_size(self):
-        """
-        Return the number of vertices in the graph
-        """
-        return len(self.vertices)
-        
-    def add_vertex(self, vertex):
-        """
-        Adds a vertex to the graph
-        """
-        self.vertices.append(vertex)
-        self.vert_dict[vertex.get_name()] = len(self.vertices) - 1
-        self.neighbors_dict[vertex.get_name()] = []
-        
-    def get_vertex(self, name):
-        """
-        Returns the vertex in the graph having the supplied name.
-        """
-        for vert in self.vertices:
-            if vert.get_name() == name:
-                return vert
-        return None
-        
-    def get_vert_index(self, vertex):
-        """
-        Returns the index of the given vertex in the vertices list
-        """
-        return self.vert_dict[vertex.name]
-            
-    def __contains__(self, vertex): 
-        """
-        Determines if the given vertex is in the graph, 
-        returning True or False.
-        """
-        for vert in self.vertices:
-            if vert.get_name() == vertex.get_name():
-                return True
-        return False
-        
-    def get_degree(self, vertex):
-        """
-        Return the number of adjacent vertices
-        """
-        return len(self.get_neighbors(vertex))
-
-    def df_search(self, vertex):
-        """
-        Returns the tree resulting in a depth-first-search 
-        of the graph starting from the supplied vertex
-        """
-        # Create the search_order list for storing the
-        # vertices visited during the traversal
-        search_order = []
-        
-        # Create the parents list: initialize all vertices to None
-        parents = [None] * len(self.vertices)
-        
-        # Create a vertex visited list: initialize to False
-        has_visited = [False] * len(self.vertices)
- 
-        # Recursively search
-        self.dfs(vertex, parents, search_order, has_visited)
-
-        # Return the Tree for display
-        return GraphTree(vertex, search_order, parents, self.vertices)
-    
-    def dfs(self, vertex, parents, search_order, has_visited):
-        """
-        Returns the tree resulting in a depth-first-search 
-        of the graph starting from the supplied vertex
-        """
-        search_order.append(vertex)
-        index = self.get_vert_index(vertex)
-        has_visited[index] = True
-
-        # Traverse the adjacency list for vertex
-        
-        adj_list = self.get_neighbors(vertex)
-        for edge in adj_list:
-            # Use recursion to go deeper when the other
-            # end of the edge has not yet been visited
-            
-            neighbor = edge.to_vertex
-            index = self.get_vert_index(neighbor)
-            if not has_visited[index]:
-            
-                # The parent of neighbor is the vertex
-                parents[index] = vertex
-
-                # Recursive search
-                self.dfs(neighbor, parents, search_order, has_visited)
-    
-    def bf_search(self, vertex):
-        """
-        Returns the tree resulting in a breadth-first-search 
-        of the graph starting from the supplied vertex
-        """
-        # Create the search_order list for storing the 
-        # vertices visited during the traversal
-        search_order = []
-        
-        # Create the parents list: initialize all vertices to None
-        parents = [None] * len(self.vertices)
-    
-        # Create a vertex visited list: initialize to False
-        has_visited = [False] * len(self.vertices)
-
-        # Create a queue for holding the vertices visited 
-        # with traversal and add the vertex to the queue
-        bfs_queue = Queue()
-        bfs_queue.enqueue(vertex)
-        
-        # Retrieve the index for the vertex 
-        # and mark it as been visited
-        index = self.get_vert_index(vertex)
-        has_visited[index] = True
-        
-        # Loop until each vertex added to the queue is gone
-        # Add each vertex to the search_order as it is dequeued
-        while not bfs_queue.is_empty():
-            vert = bfs_queue.dequeue() 
-            search_order.append(vert)
-            
-            # Traverse the edge adjacency list for all vertices
-            # place them on the queue if they have not been visited.
-            for edge in self.get_neighbors(vert):
-            
-                # Use the queue to go broader when the other
-                # end of the edge has not yet been visited
-                index = self.get_vert_index(edge.to_vertex)
-                if not has_visited[index]:
-                
-                    bfs_queue.enqueue(edge.to_vertex)
-                    parents[index] = vert
-                    has_visited[index] = True
-
-        # Return the BFS spanning iree
-        return GraphTree(vertex, search_order, parents, self.vertices)
-
-    def get_min_spanning_tree(self, root):
-        """
-        Return MST rooted at a specified vertex 
-        """
-        # Create a cost list to store the weight of an edge,
-        # that will be added to the MST
-        cost = [sys.maxsize] * len(self.vertices)
-        
-        # Create the parents list: initialize all vertices to None
-        parents = [None] * len(self.vertices)
-          
-        # Cost for starting vertex is zero
-        index = self.get_vert_index(root)
-        cost[index] = 0 
-        
-        # Total weight of the MST
-        total_weight = 0             
-
-        # Create the search_order list to hold the vertices
-        # as they are discovered for the MST
-        search_order = []
-
-        # Create the edges list to hold the edges
-        # as they are discovered for the MST
-        edges = []
-
-        # Loop finding each best vertex for the MST based on cost
-        # Until the search_order list has all the vertices
-        # One vertex is added on each round
-        while len(search_order) < self.get_size():
-           
-            current_min_cost = sys.maxsize
-
-            # Loop through each vertex which is not already
-            # added to the search_order list, and find the
-            # smallest cost vertex to add to the list
-               
-            for i in range(self.get_size()):
-                if (self.vertices[i] not in search_order and
-                            (cost[i] < current_min_cost)):
-                    current_min_cost = cost[i]
-                    min_cost_index = i
-
-            # Store the edges as they are discovered
-            if current_min_cost != 0:
-                edges.append(Edge(parents[min_cost_index],
-                                  self.vertices[min_cost_index], current_min_cost))
-
-            # Add a new vertex to search_order and
-            # the cost to the total weight
-
-            search_order.append(self.vertices[min_cost_index])
-            total_weight += cost[min_cost_index]
-
-            # Adjust the cost list values for each vertex
-            # that is adjacent to the minimum cost vertex
-            # being added to search_order list
-
-            adj_list = self.get_neighbors(self.vertices[min_cost_index])
-            for edge in adj_list:
-
-                index = self.get_vert_index(edge.to_vertex)
-                if (edge.to_vertex not in search_order and
-                            (cost[index] > edge.get_weight())):
-                    cost[index] = edge.get_weight()
-                    parents[index] = self.vertices[min_cost_index]
-
-        return MST(root, search_order, parents, self.vertices, edges, total_weight)
-
-    def get_shortest_path(self, source_vertex):
-        """
-        Return the tree representing the single source shortest path         
-        """
-        # Create a cost list to store the cost of the path 
-        # from a vertex to the source_vertex
-        cost = [sys.maxsize] * len(self.vertices)
-
-        # Cost for source_vertex is zero
-        index = self.get_vert_index(source_vertex)
-        cost[index] = 0
-
-        # Create the parents list: initialize all vertices to None
-        parents = [None] * len(self.vertices)
-        
-        # search_order stores the vertices whose path found so far
-        search_order = []
-
-        # Create the edges list to hold the edges
-        # as they are discovered for the path
-        edges = []
-
-        # Expand the search_order list
-        while len(search_order) < self.get_size():
-
-            current_min_cost = sys.maxsize
-
-            # Loop through each vertex which is not already
-            # added to the search_order list, and find the
-            # smallest cost vertex to add to the list
-
-            for i in range(self.get_size()):
-                if (self.vertices[i] not in search_order and
-                            (cost[i] < current_min_cost)):
-                    current_min_cost = cost[i]
-                    min_cost_index = i
-
-            if current_min_cost != 0:
-                edges.append(Edge(parents[min_cost_index],
-                        self.vertices[min_cost_index], current_min_cost))
-
-            # Add a new vertex to search_order
-            search_order.append(self.vertices[min_cost_index])
-
-            # Adjust the cost list values for each vertex
-            # that is adjacent to the minimum cost vertex
-            # being added to search_order list
-
-            adj_list = self.get_neighbors(self.vertices[min_cost_index])
-            for edge in adj_list:
-
-                index = self.get_vert_index(edge.to_vertex)
-                if (edge.to_vertex not in search_order and
-                    (cost[index] > (cost[min_cost_index] + edge.get_weight()))):
-                
-                    cost[index] = cost[min_cost_index] + edge.get_weight()
-                    parents[index] = self.vertices[min_cost_index]
-
-        return ShortestPathTree(source_vertex, search_order, parents, self.vertices, edges, cost)
+from vertex import Vertex
+from edge import Edge
+from graphTree import GraphTree, SparseList
+from mst import MST
+from shortestPathTree import ShortestPathTree
+from adjacencyArrays import AdjacencyArrays
+from componentIndex import ComponentIndex
+from searchWorkspace import get_workspace
+from array import array
+import heapq
+import sys
+
+
+class Graph:
+    """
+    This class represents a Graph, which has Vertices and Edges.    
+    The Vertices are stored in a Python list: vertices
+    The Edges are stored in vertex adjacency lists, which are
+    kept in a dictionary where the key is the Vertex name and
+    the adjacency list is the value.  The list contains the Edges.
+    An additional dictionary is kept to retrieve the index 
+    for a Vertex using the Vertex name as the key    
+    """ 
+    def __init__(self, vertices=None, edges=None):        
+        """
+        Creates a new, empty graph
+        Instance variables:
+           self.vertices: Python list
+           self.neighbors_dict: Python dictionary of adj_lists
+           self.vert_dict: Python dictionary of indices
+           self.adjacency: AdjacencyArrays cache, rebuilt on demand
+           self.components: ComponentIndex of connected components
+           self.weight_layers: Python dictionary of the functions
+                               giving each Edge's weight in a named
+                               weight layer, keyed by layer name
+        """        
+        self.vertices = vertices 
+        self.neighbors_dict = {}
+        self.vert_dict = {}
+        self.adjacency = None
+        self.components = ComponentIndex()
+        self.weight_layers = {}
+
+        if vertices is not None:
+            """ 
+            Traverse vertices list to create two dictionaries:
+            self.neighbors_dict and self.vert_dict
+            where the key is the name of the vertex
+            """
+            for index in range(len(self.vertices)):
+                self.vert_dict[vertices[index].get_name()] = index
+                self.neighbors_dict[vertices[index].get_name()] = []
+                self.components.add_vertex()
+            
+            self.create_adj_lists(edges)
+
+    def create_adj_lists(self, edges):
+        """
+        Using given edges, create an adjacency list for each vertex
+        """
+        for edge in edges:
+            self.add_edge(edge) 
+        
+    def add_edge(self, edge): 
+        """
+        Adds a new edge to the graph 
+        """
+        name = edge.from_vertex.get_name()
+        adj_list = self.neighbors_dict[name]
+        adj_list.append(edge)
+        self.adjacency = None
+        self.components.union(self.vert_dict[name],
+                              self.get_vert_index(edge.to_vertex))
+        
+    def get_edge(self, from_vert, to_vert): 
+        """
+        Returns the edge in the graph having the supplied vertices
+        """
+        adj_list = self.get_neighbors(from_vert)
+        
+        for edge in adj_list:
+            if edge.to_vertex.get_name() == to_vert.get_name():
+                return edge
+        return None
+    
+    def get_neighbors(self, vertex):
+        """
+        Return the adjacency list for vertex
+        """
+        return self.neighbors_dict[vertex.get_name()] 
+    
+    def get_vertices(self): 
+        """
+        Returns the list of all vertices in the graph. 
+        """
+        return self.vertices 
+           
+    def get_size(self):
+        """
+        Return the number of vertices in the graph
+        """
+        return len(self.vertices)
+        
+    def add_vertex(self, vertex):
+        """
+        Adds a vertex to the graph
+        """
+        self.vertices.append(vertex)
+        self.vert_dict[vertex.get_name()] = len(self.vertices) - 1
+        self.neighbors_dict[vertex.get_name()] = []
+        self.adjacency = None
+        self.components.add_vertex()
+
+    def get_adjacency_arrays(self, layer=None):
+        """
+        Return the index based AdjacencyArrays for the graph, using
+        the weights of the named weight layer (the Edge weights when
+        layer is None), building them the first time after the
+        graph changes
+        """
+        if self.adjacency is None:
+            self.adjacency = AdjacencyArrays(self)
+            for name, weight_of in self.weight_layers.items():
+                self.adjacency.add_layer(name, array('d', [weight_of(edge)
+                                                           for edge in self.adjacency.edges]))
+        return self.adjacency.get_layer(layer)
+
+    def add_weight_layer(self, name, weight_of):
+        """
+        Add the weight layer name, giving each Edge the
+        weight weight_of(edge), e.g. travel time in minutes
+        """
+        self.weight_layers[name] = weight_of
+        self.adjacency = None
+
+    def get_layer_names(self):
+        """
+        Return the list of weight layer names
+        """
+        return list(self.weight_layers)
+
+    def _out_edges(self, index, layer):
+        """
+        Return (neighbor index, weight) for each Edge leaving the
+        vertex at index, with the weights of the named layer
+        """
+        if layer is None:
+            return [(self.vert_dict[edge.to_vertex.get_name()], edge.get_weight())
+                    for edge in self.neighbors_dict[self.vertices[index].get_name()]]
+        adjacency = self.get_adjacency_arrays(layer)
+        start = adjacency.offsets[index]
+        end = adjacency.offsets[index + 1]
+        return zip(adjacency.targets[start:end], adjacency.weights[start:end])
+        
+    def get_vertex(self, name):
+        """
+        Returns the vertex in the graph having the supplied name.
+        """
+        for vert in self.vertices:
+            if vert.get_name() == name:
+                return vert
+        return None
+        
+    def get_vert_index(self, vertex):
+        """
+        Returns the index of the given vertex in the vertices list
+        """
+        return self.vert_dict[vertex.name]
+            
+    def __contains__(self, vertex): 
+        """
+        Determines if the given vertex is in the graph, 
+        returning True or False.
+        """
+        for vert in self.vertices:
+            if vert.get_name() == vertex.get_name():
+                return True
+        return False
+        
+    def is_connected(self, vertex1, vertex2):
+        """
+        Return True if the two vertices are in the same connected
+        component.  When this is False no path joins them.
+        """
+        return self.components.same_component(self.get_vert_index(vertex1),
+                                              self.get_vert_index(vertex2))
+
+    def get_degree(self, vertex):
+        """
+        Return the number of adjacent vertices
+        """
+        return len(self.get_neighbors(vertex))
+
+    def df_search(self, vertex):
+        """
+        Returns the tree resulting in a depth-first-search 
+        of the graph starting from the supplied vertex
+        """
+        # Create the search_order list for storing the
+        # vertices visited during the traversal
+        search_order = []
+        
+        # Parents of the vertices found, keyed by index:
+        # every vertex not in it has the parent None
+        parents = {}
+        
+        # Take this thread's search workspace for the visited marks:
+        # it starts with every vertex unvisited
+        has_visited = get_workspace(len(self.vertices))
+ 
+        # Recursively search
+        self.dfs(vertex, parents, search_order, has_visited)
+
+        # Return the Tree for display
+        return GraphTree(vertex, search_order,
+                         SparseList(len(self.vertices), parents), self.vertices)
+    
+    def dfs(self, vertex, parents, search_order, has_visited):
+        """
+        Returns the tree resulting in a depth-first-search 
+        of the graph starting from the supplied vertex
+        has_visited is the SearchWorkspace marking visited vertices,
+        parents a list or Python dictionary filled in by index
+        """
+        search_order.append(vertex)
+        index = self.get_vert_index(vertex)
+        has_visited.visit(index)
+
+        # Traverse the adjacency list for vertex
+        
+        adj_list = self.get_neighbors(vertex)
+        for edge in adj_list:
+            # Use recursion to go deeper when the other
+            # end of the edge has not yet been visited
+            
+            neighbor = edge.to_vertex
+            index = self.get_vert_index(neighbor)
+            if not has_visited.is_visited(index):
+            
+                # The parent of neighbor is the vertex
+                parents[index] = vertex
+
+                # Recursive search
+                self.dfs(neighbor, parents, search_order, has_visited)
+    
+    def bf_search(self, vertex):
+        """
+        Returns the tree resulting in a breadth-first-search 
+        of the graph starting from the supplied vertex
+        The search runs level by level over the index based
+        adjacency arrays, so no Vertex index is ever looked up by
+        name.  Each level is still expanded edge by edge in Python:
+        a graph of 10**6 vertices and 6 * 10**6 random edges takes
+        about 2 s
+        """
+        adjacency = self.get_adjacency_arrays()
+        offsets = adjacency.offsets
+        targets = adjacency.targets
+
+        # Take this thread's search workspace: its byte marks are
+        # the visited bitmap (a vertex is visited when its mark is
+        # this search's), and its parents array holds parent indices
+        workspace = get_workspace(len(self.vertices))
+        mark = workspace.mark
+        marks = workspace.marks
+        parent_index = workspace.parents
+
+        # Retrieve the index for the vertex
+        # and mark it as been visited
+        index = self.get_vert_index(vertex)
+        marks[index] = mark
+
+        # Indices in the order visited; the frontier holds the
+        # last level found, in the order a queue would hold it
+        order = [index]
+        frontier = [index]
+
+        while frontier:
+            next_frontier = []
+            append = next_frontier.append
+
+            # The neighbors of the frontier not yet visited,
+            # in the order found, are the next level
+            for index in frontier:
+                for neighbor in targets[offsets[index]:offsets[index + 1]]:
+                    if marks[neighbor] != mark:
+                        marks[neighbor] = mark
+                        parent_index[neighbor] = index
+                        append(neighbor)
+
+            order.extend(next_frontier)
+            frontier = next_frontier
+
+        # Turn the indices back into vertices for the tree; only
+        # the vertices found get a parent, so nothing here grows
+        # with the vertices the search never reached
+        search_order = [self.vertices[index] for index in order]
+        parents = SparseList(len(self.vertices),
+                             {index: self.vertices[parent_index[index]]
+                              for index in order[1:]})
+
+        # Return the BFS spanning tree
+        return GraphTree(vertex, search_order, parents, self.vertices)
+
+    def iter_df_search(self, vertex, max_depth=None, max_visits=None, dest=None):
+        """
+        Generator version of df_search: yields (vertex, parent, depth)
+        tuples in the same order df_search visits the vertices, doing
+        only as much of the traversal as the caller consumes.
+        Vertices deeper than max_depth are not visited, at most
+        max_visits vertices are yielded, and the traversal ends
+        right after dest is yielded.
+        The visited marks are kept in a set, so a traversal that
+        stops early never pays for a list over all the vertices
+        """
+        adjacency = self.get_adjacency_arrays()
+        offsets = adjacency.offsets
+        targets = adjacency.targets
+
+        index = self.get_vert_index(vertex)
+        dest_index = -1
+        if dest is not None:
+            dest_index = self.get_vert_index(dest)
+        has_visited = {index}
+
+        yield vertex, None, 0
+        num_visits = 1
+        if index == dest_index:
+            return
+
+        # Each stack entry is a vertex index, its depth and
+        # the position of the next edge to look at
+        stack = [(index, 0, offsets[index])]
+        while stack:
+            if max_visits is not None and num_visits >= max_visits:
+                return
+
+            index, depth, pos = stack.pop()
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            # Go deeper along the first edge leading to an
+            # unvisited vertex, coming back here afterwards
+            while pos < offsets[index + 1]:
+                neighbor = targets[pos]
+                pos += 1
+                if neighbor not in has_visited:
+                    has_visited.add(neighbor)
+                    stack.append((index, depth, pos))
+                    stack.append((neighbor, depth + 1, offsets[neighbor]))
+
+                    yield self.vertices[neighbor], self.vertices[index], depth + 1
+                    num_visits += 1
+                    if neighbor == dest_index:
+                        return
+                    break
+
+    def iter_bf_search(self, vertex, max_depth=None, max_visits=None, dest=None):
+        """
+        Generator version of bf_search: yields (vertex, parent, depth)
+        tuples in the same order bf_search visits the vertices, doing
+        only as much of the traversal as the caller consumes.
+        Vertices deeper than max_depth are not visited, at most
+        max_visits vertices are yielded, and the traversal ends
+        right after dest is yielded
+        """
+        adjacency = self.get_adjacency_arrays()
+        offsets = adjacency.offsets
+        targets = adjacency.targets
+
+        index = self.get_vert_index(vertex)
+        dest_index = -1
+        if dest is not None:
+            dest_index = self.get_vert_index(dest)
+        has_visited = {index}
+
+        yield vertex, None, 0
+        num_visits = 1
+        if index == dest_index:
+            return
+
+        depth = 0
+        frontier = [index]
+
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for index in frontier:
+                for neighbor in targets[offsets[index]:offsets[index + 1]]:
+                    if neighbor in has_visited:
+                        continue
+                    if max_visits is not None and num_visits >= max_visits:
+                        return
+                    has_visited.add(neighbor)
+                    next_frontier.append(neighbor)
+
+                    yield self.vertices[neighbor], self.vertices[index], depth
+                    num_visits += 1
+                    if neighbor == dest_index:
+                        return
+            frontier = next_frontier
+
+    def get_min_spanning_tree(self, root, forest=False, layer=None):
+        """
+        Return MST rooted at a specified vertex 
+        The tree spans the connected component of root.  When forest
+        is True the remaining components are each given a tree of
+        their own, rooted at their first vertex, giving a minimum
+        spanning forest of the whole graph.
+        Edges are weighed with the named weight layer, if given
+        """
+        # Take this thread's search workspace: its visited marks
+        # tell which vertices are in search_order
+        workspace = get_workspace(len(self.vertices))
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+
+        # Weight of the edge that will add each vertex reached but
+        # not yet in search_order to the MST, keyed by index; the
+        # weights keep the type the edges give them
+        frontier = {}
+        
+        # Parents of the vertices reached, keyed by index:
+        # every vertex not in it has the parent None
+        parents = {}
+          
+        # Cost for starting vertex is zero
+        index = self.get_vert_index(root)
+        frontier[index] = 0
+        
+        # Total weight of the MST
+        total_weight = 0             
+
+        # The roots of the trees, one per component searched
+        roots = [root]
+
+        # Number of vertices the search can reach
+        if forest:
+            num_verts = self.get_size()
+        else:
+            num_verts = self.components.get_component_size(index)
+
+        # Create the search_order list to hold the vertices
+        # as they are discovered for the MST
+        search_order = []
+
+        # Create the edges list to hold the edges
+        # as they are discovered for the MST
+        edges = []
+
+        # Loop finding each best vertex for the MST based on cost
+        # Until the search_order list has all the vertices
+        # One vertex is added on each round
+        while len(search_order) < num_verts:
+           
+            current_min_cost = sys.maxsize
+
+            # Loop through each vertex reached but not already
+            # added to the search_order list, and find the
+            # smallest cost vertex to add to the list, the
+            # lowest index among equal costs
+               
+            for i, i_cost in frontier.items():
+                if (i_cost < current_min_cost or
+                        (i_cost == current_min_cost and i < min_cost_index)):
+                    current_min_cost = i_cost
+                    min_cost_index = i
+
+            # The current tree is complete: start the next one
+            # from the first vertex not yet in any tree
+            if current_min_cost == sys.maxsize:
+                if not forest:
+                    break
+                for i in range(self.get_size()):
+                    if visit_stamps[i] != epoch:
+                        min_cost_index = i
+                        break
+                current_min_cost = 0
+                frontier[min_cost_index] = 0
+                roots.append(self.vertices[min_cost_index])
+
+            # Store the edges as they are discovered
+            if current_min_cost != 0:
+                edges.append(Edge(parents[min_cost_index],
+                                  self.vertices[min_cost_index], current_min_cost))
+
+            # Add a new vertex to search_order and
+            # the cost to the total weight
+
+            search_order.append(self.vertices[min_cost_index])
+            visit_stamps[min_cost_index] = epoch
+            total_weight += frontier.pop(min_cost_index)
+
+            # Adjust the cost list values for each vertex
+            # that is adjacent to the minimum cost vertex
+            # being added to search_order list
+
+            for index, weight in self._out_edges(min_cost_index, layer):
+                if (visit_stamps[index] != epoch and
+                            (frontier.get(index, sys.maxsize) > weight)):
+                    frontier[index] = weight
+                    parents[index] = self.vertices[min_cost_index]
+
+        return MST(root, search_order, SparseList(len(self.vertices), parents),
+                   self.vertices, edges, total_weight, roots)
+
+    def get_shortest_path(self, source_vertex, layer=None):
+        """
+        Return the tree representing the single source shortest path         
+        Edges are weighed with the named weight layer, if given
+        The costs and parents are kept only for the vertices reached,
+        so a search of a small component does no work, and builds
+        nothing, for the rest of the graph
+        """
+        # Cost of the path from the source_vertex to each vertex
+        # reached but not yet in search_order, keyed by index
+        frontier = {}
+
+        # Cost for source_vertex is zero
+        index = self.get_vert_index(source_vertex)
+        frontier[index] = 0
+
+        # Costs and parents of the vertices in search_order, keyed
+        # by index: every other vertex costs sys.maxsize and has
+        # the parent None
+        cost = {}
+        parents = {}
+        
+        # search_order stores the vertices whose path found so far
+        search_order = []
+
+        # Take this thread's search workspace: its visited marks
+        # tell which vertices are in search_order
+        workspace = get_workspace(len(self.vertices))
+        epoch = workspace.epoch
+        visit_stamps = workspace.visit_stamps
+
+        # Create the edges list to hold the edges
+        # as they are discovered for the path
+        edges = []
+
+        # Expand the search_order list until
+        # every vertex left is unreachable
+        while frontier:
+
+            # Find the smallest cost vertex reached but not yet
+            # added to the search_order list, the lowest index
+            # among equal costs
+            current_min_cost = sys.maxsize
+            for i, i_cost in frontier.items():
+                if (i_cost < current_min_cost or
+                        (i_cost == current_min_cost and i < min_cost_index)):
+                    current_min_cost = i_cost
+                    min_cost_index = i
+
+            if current_min_cost != 0:
+                edges.append(Edge(parents[min_cost_index],
+                        self.vertices[min_cost_index], current_min_cost))
+
+            # Add a new vertex to search_order
+            search_order.append(self.vertices[min_cost_index])
+            visit_stamps[min_cost_index] = epoch
+            cost[min_cost_index] = frontier.pop(min_cost_index)
+
+            # Adjust the cost list values for each vertex
+            # that is adjacent to the minimum cost vertex
+            # being added to search_order list
+
+            for index, weight in self._out_edges(min_cost_index, layer):
+                if (visit_stamps[index] != epoch and
+                    (frontier.get(index, sys.maxsize) > (current_min_cost + weight))):
+                
+                    frontier[index] = current_min_cost + weight
+                    parents[index] = self.vertices[min_cost_index]
+
+        size = len(self.vertices)
+        return ShortestPathTree(source_vertex, search_order, SparseList(size, parents),
+                                self.vertices, edges, SparseList(size, cost, sys.maxsize))
+
+    def k_shortest_paths(self, source_vertex, dest_vertex, k, layer=None):
+        """
+        Return up to k loopless paths from source_vertex to dest_vertex
+        in order of increasing cost, found with Yen's algorithm.
+        Each path is a tuple (total cost, list of Edges).
+        Edges are weighed with the named weight layer, if given
+        """
+        adjacency = self.get_adjacency_arrays(layer)
+        source = self.get_vert_index(source_vertex)
+        dest = self.get_vert_index(dest_vertex)
+
+        cost, path = adjacency.shortest_path(source, dest)
+        if path is None or k < 1:
+            return []
+
+        # Each accepted path is kept as (cost, edge positions, index
+        # of the edge where it left the path it was spurred from)
+        accepted = [(cost, path, 0)]
+        found = {tuple(path)}
+
+        # Candidate paths from every round share one heap
+        candidates = []
+
+        while len(accepted) < k:
+            prev_cost, prev_path, deviation = accepted[-1]
+            nodes = [source] + [adjacency.targets[pos] for pos in prev_path]
+
+            # Spur paths leaving before the deviation point were
+            # already tried when prev_path's own parent was expanded
+            root_cost = 0
+            for pos in prev_path[:deviation]:
+                root_cost += adjacency.weights[pos]
+
+            for j in range(deviation, len(prev_path)):
+                root_path = prev_path[:j]
+
+                # Block the next edge of every accepted path that
+                # shares this root, and the root's own vertices
+                banned_edges = set()
+                for other_cost, other_path, other_dev in accepted:
+                    if len(other_path) > j and other_path[:j] == root_path:
+                        banned_edges.add(other_path[j])
+                banned_vertices = set(nodes[:j])
+
+                spur_cost, spur_path = adjacency.shortest_path(
+                    nodes[j], dest, banned_vertices, banned_edges)
+
+                if spur_path is not None:
+                    new_path = root_path + spur_path
+                    if tuple(new_path) not in found:
+                        found.add(tuple(new_path))
+                        heapq.heappush(candidates,
+                                       (root_cost + spur_cost, len(found), new_path, j))
+
+                root_cost += adjacency.weights[prev_path[j]]
+
+            if not candidates:
+                break
+            cost, count, path, deviation = heapq.heappop(candidates)
+            accepted.append((cost, path, deviation))
+
+        return [(cost, [adjacency.edges[pos] for pos in path])
+                for cost, path, deviation in accepted]
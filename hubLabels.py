@@ -0,0 +1,223 @@
+from array import array
+import bisect
+import heapq
+import sys
+import time
+
+
+class HubLabels:
+    """
+    This class is a distance oracle for a Graph built with pruned
+    landmark labeling.  Every vertex gets two labels:
+        out label: hubs the vertex can reach, with the distance to each
+        in label:  hubs that can reach the vertex, with the distance
+    Every shortest path s -> t passes through a hub that appears in
+    both the out label of s and the in label of t, so a distance query
+    only has to merge those two sorted labels; no graph search is run.
+    Hubs are taken in order of decreasing degree.  Each hub runs one
+    forward and one backward Dijkstra search that stops expanding any
+    vertex whose distance the labels built so far already give.
+    Each label entry also remembers the next vertex toward its hub,
+    so the full path can be recovered.
+    """
+    def __init__(self, graph, layer=None):
+        """
+        Build the labels for graph, over the named weight layer if given
+        Instance variables:
+            self.graph: Graph the labels were built from
+            self.rank: Python list, hub rank of each vertex index
+            self.order: Python list, vertex index of each hub rank
+            self.out_hubs, self.in_hubs: Python lists holding, per
+                vertex, an array of hub ranks in ascending order
+            self.out_dists, self.in_dists: matching arrays of distances
+            self.out_next, self.in_next: matching arrays of the next
+                vertex index on the path toward the hub
+            self.build_time: float: seconds taken to build the labels
+        """
+        start_time = time.perf_counter()
+
+        self.graph = graph
+        adjacency = graph.get_adjacency_arrays(layer)
+        reverse = adjacency.reverse()
+        size = adjacency.get_size()
+
+        # Busy vertices lie on many shortest paths: make them hubs first
+        degree = [adjacency.offsets[i + 1] - adjacency.offsets[i]
+                  + reverse.offsets[i + 1] - reverse.offsets[i] for i in range(size)]
+        self.order = sorted(range(size), key=lambda index: -degree[index])
+        self.rank = [0] * size
+        for rank, index in enumerate(self.order):
+            self.rank[index] = rank
+
+        self.out_hubs = [array('l') for i in range(size)]
+        self.out_dists = [array('d') for i in range(size)]
+        self.out_next = [array('l') for i in range(size)]
+        self.in_hubs = [array('l') for i in range(size)]
+        self.in_dists = [array('d') for i in range(size)]
+        self.in_next = [array('l') for i in range(size)]
+
+        for rank, hub in enumerate(self.order):
+            # Forward search: distances hub -> u go in the in labels
+            self._pruned_search(hub, rank, adjacency,
+                                self.out_hubs[hub], self.out_dists[hub],
+                                self.in_hubs, self.in_dists, self.in_next)
+            # Backward search: distances u -> hub go in the out labels
+            self._pruned_search(hub, rank, reverse,
+                                self.in_hubs[hub], self.in_dists[hub],
+                                self.out_hubs, self.out_dists, self.out_next)
+
+        self.build_time = time.perf_counter() - start_time
+
+    def _pruned_search(self, hub, rank, adjacency, hub_label_hubs, hub_label_dists,
+                       label_hubs, label_dists, label_next):
+        """
+        Run the pruned Dijkstra search for one hub over adjacency,
+        adding an entry for the hub to the labels of every vertex
+        whose distance the existing labels do not already give
+        """
+        # Distances from the hub's own label, by hub rank
+        hub_dists = dict(zip(hub_label_hubs, hub_label_dists))
+
+        offsets = adjacency.offsets
+        targets = adjacency.targets
+        weights = adjacency.weights
+
+        cost = {hub: 0}
+        prev = {hub: hub}
+        settled = set()
+        heap = [(0, hub)]
+        while heap:
+            dist, index = heapq.heappop(heap)
+            if index in settled:
+                continue
+            settled.add(index)
+
+            # Prune: a higher ranked hub already covers this pair
+            known = sys.maxsize
+            for other, other_dist in zip(label_hubs[index], label_dists[index]):
+                if other in hub_dists and hub_dists[other] + other_dist < known:
+                    known = hub_dists[other] + other_dist
+            if known <= dist:
+                continue
+
+            label_hubs[index].append(rank)
+            label_dists[index].append(dist)
+            label_next[index].append(prev[index])
+
+            for pos in range(offsets[index], offsets[index + 1]):
+                neighbor = targets[pos]
+                new_cost = dist + weights[pos]
+                if neighbor not in settled and new_cost < cost.get(neighbor, sys.maxsize):
+                    cost[neighbor] = new_cost
+                    prev[neighbor] = index
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+    def _best_hub(self, source, dest):
+        """
+        Merge the out label of source with the in label of dest
+        and return the shortest distance and the hub rank giving it
+        """
+        out_hubs = self.out_hubs[source]
+        out_dists = self.out_dists[source]
+        in_hubs = self.in_hubs[dest]
+        in_dists = self.in_dists[dest]
+
+        best = sys.maxsize
+        best_hub = -1
+        i = 0
+        j = 0
+        while i < len(out_hubs) and j < len(in_hubs):
+            if out_hubs[i] < in_hubs[j]:
+                i += 1
+            elif out_hubs[i] > in_hubs[j]:
+                j += 1
+            else:
+                if out_dists[i] + in_dists[j] < best:
+                    best = out_dists[i] + in_dists[j]
+                    best_hub = out_hubs[i]
+                i += 1
+                j += 1
+        return best, best_hub
+
+    def get_distance(self, source_vertex, dest_vertex):
+        """
+        Return the shortest path distance between the two vertices,
+        or sys.maxsize when dest_vertex cannot be reached
+        """
+        return self.get_index_distance(self.graph.get_vert_index(source_vertex),
+                                       self.graph.get_vert_index(dest_vertex))
+
+    def get_index_distance(self, source, dest):
+        """
+        Return the shortest path distance between two vertex indices
+        """
+        return self._best_hub(source, dest)[0]
+
+    def get_path(self, source_vertex, dest_vertex):
+        """
+        Return the list of vertices on a shortest path from
+        source_vertex to dest_vertex, or None when unreachable
+        """
+        source = self.graph.get_vert_index(source_vertex)
+        dest = self.graph.get_vert_index(dest_vertex)
+        dist, hub_rank = self._best_hub(source, dest)
+        if hub_rank == -1:
+            return None
+        hub = self.order[hub_rank]
+
+        # Walk the out labels from source up to the hub ...
+        path = [source]
+        index = source
+        while index != hub:
+            index = self._next_toward(self.out_hubs, self.out_next, index, hub_rank)
+            path.append(index)
+
+        # ... and the in labels back from dest down to the hub
+        tail = []
+        index = dest
+        while index != hub:
+            tail.append(index)
+            index = self._next_toward(self.in_hubs, self.in_next, index, hub_rank)
+        tail.reverse()
+
+        vertices = self.graph.get_vertices()
+        return [vertices[index] for index in path + tail]
+
+    def _next_toward(self, label_hubs, label_next, index, hub_rank):
+        """
+        Return the next vertex index after index on its path to the hub
+        """
+        hubs = label_hubs[index]
+        pos = bisect.bisect_left(hubs, hub_rank)
+        return label_next[index][pos]
+
+    def get_num_entries(self):
+        """
+        Return the total number of label entries, in and out
+        """
+        return (sum(len(hubs) for hubs in self.out_hubs)
+                + sum(len(hubs) for hubs in self.in_hubs))
+
+    def get_size_in_bytes(self):
+        """
+        Return the number of bytes held in the label arrays
+        """
+        num_bytes = 0
+        for labels in (self.out_hubs, self.out_dists, self.out_next,
+                       self.in_hubs, self.in_dists, self.in_next):
+            for values in labels:
+                num_bytes += values.itemsize * len(values)
+        return num_bytes
+
+    def get_stats_str(self):
+        """
+        Return a string reporting label size and build time
+        """
+        num_verts = len(self.rank)
+        num_entries = self.get_num_entries()
+        stats_str = "Hub labels for {} vertices\n".format(num_verts)
+        stats_str += "Build time: {:.3f} seconds\n".format(self.build_time)
+        stats_str += "Label entries: {} ({:.1f} per vertex, in and out)\n".format(
+            num_entries, num_entries / max(num_verts, 1))
+        stats_str += "Label arrays: {} bytes\n".format(self.get_size_in_bytes())
+        return stats_str
@@ -0,0 +1,210 @@
+from array import array
+import math
+import random
+import sys
+
+
+class Landmarks:
+    """
+    This class holds the ALT (A*, Landmarks, Triangle inequality)
+    preprocessing for a Graph: the distances from and to a handful
+    of landmark vertices, stored in one array per landmark.
+    For any landmark L the triangle inequality gives two lower
+    bounds on the distance from v to t:
+        d(L, t) - d(L, v)   and   d(v, L) - d(t, L)
+    and the largest of these over all landmarks drives A*.
+    Landmarks can be chosen with three strategies:
+        farthest: each new landmark is the vertex farthest from
+                  the landmarks chosen so far
+        avoid:    each new landmark is picked from the part of a
+                  shortest path tree that the current landmarks
+                  bound worst (Goldberg and Werneck)
+        planar:   the map is cut into equal pie slices around its
+                  center and the vertex farthest out in each slice
+                  is chosen (needs City coordinates)
+    """
+    STRATEGIES = ("farthest", "avoid", "planar")
+
+    def __init__(self, graph, num_landmarks=4, strategy="farthest", seed=0, layer=None):
+        """
+        Choose the landmarks and compute their distances,
+        over the named weight layer if given
+        Instance variables:
+            self.graph: Graph the distances were computed on
+            self.layer: name of the weight layer, or None
+            self.landmarks: Python list of landmark vertex indices
+            self.dist_from: Python list, per landmark, of an array
+                            holding d(landmark, v) for every v
+            self.dist_to: Python list, per landmark, of an array
+                          holding d(v, landmark) for every v
+        Unreachable distances are stored as infinity
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError("Unknown landmark strategy: " + str(strategy))
+
+        self.graph = graph
+        self.layer = layer
+        self.adjacency = graph.get_adjacency_arrays(layer)
+        self.reverse = self.adjacency.reverse()
+        self.random = random.Random(seed)
+        self.landmarks = []
+        self.dist_from = []
+        self.dist_to = []
+
+        num_landmarks = min(num_landmarks, self.adjacency.get_size())
+        if strategy == "planar":
+            self._choose_planar(num_landmarks)
+        while len(self.landmarks) < num_landmarks:
+            if strategy == "avoid":
+                self._add_landmark(self._choose_avoid())
+            else:
+                self._add_landmark(self._choose_farthest())
+
+    def _add_landmark(self, index):
+        """
+        Make the vertex at index a landmark and store its distances
+        """
+        self.landmarks.append(index)
+        for adjacency, distances in ((self.adjacency, self.dist_from),
+                                     (self.reverse, self.dist_to)):
+            cost, parents = adjacency.dijkstra(index)
+            distances.append(array('d', [float("inf") if dist == sys.maxsize else dist
+                                         for dist in cost]))
+
+    def _choose_farthest(self):
+        """
+        Return the vertex farthest from the landmarks so far,
+        or from a random vertex when there are none yet.
+        When every vertex they reach is already a landmark (a map
+        in pieces, or with one-way roads), return the first vertex
+        they do not reach, which starts on another piece
+        """
+        if not self.landmarks:
+            start = self.random.randrange(self.adjacency.get_size())
+            cost, parents = self.adjacency.dijkstra(start)
+            closest = cost
+        else:
+            closest = [min(dist_from[index] for dist_from in self.dist_from)
+                       for index in range(self.adjacency.get_size())]
+
+        best = -1
+        best_dist = -1
+        for index in range(len(closest)):
+            dist = closest[index]
+            if dist != sys.maxsize and dist != float("inf") and dist > best_dist:
+                if index not in self.landmarks:
+                    best = index
+                    best_dist = dist
+
+        if best == -1:
+            for index in range(len(closest)):
+                if index not in self.landmarks:
+                    return index
+        return best
+
+    def _choose_avoid(self):
+        """
+        Return a new landmark chosen with the avoid strategy:
+        grow a shortest path tree from a random root, weigh each
+        vertex by how far its true distance is above the current
+        lower bound, and walk down the heaviest subtrees (skipping
+        those already holding a landmark) to a leaf
+        """
+        size = self.adjacency.get_size()
+        root = self.random.randrange(size)
+        cost, parents = self.adjacency.dijkstra(root)
+
+        reached = [index for index in range(size) if cost[index] != sys.maxsize]
+        children = [[] for i in range(size)]
+        for index in reached:
+            if parents[index] != -1:
+                children[parents[index]].append(index)
+
+        # Subtree sizes, children before parents
+        weight = [0.0] * size
+        has_landmark = [False] * size
+        for index in sorted(reached, key=lambda index: -cost[index]):
+            weight[index] += cost[index] - self.get_lower_bound(root, index)
+            if index in self.landmarks:
+                has_landmark[index] = True
+            if parents[index] != -1:
+                weight[parents[index]] += weight[index]
+                has_landmark[parents[index]] |= has_landmark[index]
+        for index in reached:
+            if has_landmark[index]:
+                weight[index] = 0.0
+
+        index = max(reached, key=lambda index: weight[index])
+        while children[index]:
+            child = max(children[index], key=lambda child: weight[child])
+            if weight[child] <= 0.0:
+                break
+            index = child
+
+        if index in self.landmarks:
+            return self._choose_farthest()
+        return index
+
+    def _choose_planar(self, num_landmarks):
+        """
+        Choose up to num_landmarks landmarks, the vertex farthest
+        from the center of the map in each of num_landmarks slices
+        """
+        vertices = self.graph.get_vertices()
+        center_x = sum(vertex.get_X() for vertex in vertices) / len(vertices)
+        center_y = sum(vertex.get_Y() for vertex in vertices) / len(vertices)
+
+        best = [-1] * num_landmarks
+        best_dist = [-1.0] * num_landmarks
+        for index, vertex in enumerate(vertices):
+            dx = vertex.get_X() - center_x
+            dy = vertex.get_Y() - center_y
+            angle = math.atan2(dy, dx) % (2 * math.pi)
+            sector = min(int(angle / (2 * math.pi) * num_landmarks), num_landmarks - 1)
+            dist = math.hypot(dx, dy)
+            if dist > best_dist[sector]:
+                best[sector] = index
+                best_dist[sector] = dist
+
+        for index in best:
+            if index != -1:
+                self._add_landmark(index)
+
+    def get_landmark_vertices(self):
+        """
+        Return the list of landmark vertices
+        """
+        vertices = self.graph.get_vertices()
+        return [vertices[index] for index in self.landmarks]
+
+    def get_lower_bound(self, source, dest):
+        """
+        Return the triangle inequality lower bound
+        on the distance between two vertex indices
+        """
+        return self.get_heuristic(dest)(source)
+
+    def get_heuristic(self, dest):
+        """
+        Return a function giving, for a vertex index, the lower
+        bound on its distance to the dest index, for use with A*
+        """
+        inf = float("inf")
+        bounds = []
+        for dist_from, dist_to in zip(self.dist_from, self.dist_to):
+            bounds.append((dist_from, dist_from[dest], dist_to, dist_to[dest]))
+
+        def heuristic(index):
+            best = 0.0
+            for dist_from, from_dest, dist_to, to_dest in bounds:
+                # d(L, t) - d(L, v): skip when either end is unreachable
+                if from_dest != inf and dist_from[index] != inf:
+                    if from_dest - dist_from[index] > best:
+                        best = from_dest - dist_from[index]
+                # d(v, L) - d(t, L)
+                if to_dest != inf and dist_to[index] != inf:
+                    if dist_to[index] - to_dest > best:
+                        best = dist_to[index] - to_dest
+            return best
+
+        return heuristic
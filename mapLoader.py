@@ -0,0 +1,155 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import os
+
+from city import City
+from cityRoadMap import CityRoadMap
+from road import Road
+
+"""
+Parallel loading of a map file of CITY and ROAD records
+(the same format build_map reads) into a CityRoadMap.
+
+ 1. The file is split into byte ranges ending on line boundaries,
+    and worker processes parse the ranges into typed arrays.
+ 2. The parent process joins the ranges in file order and resolves
+    City names to indices.
+ 3. The Road geometry (direction and distance) is computed by the
+    workers in chunks of roads, and the Roads are built from it.
+
+The result is the same CityRoadMap build_map produces.
+"""
+
+CITY_REC = "CITY"
+ROAD_REC = "ROAD"
+
+# Files smaller than this are parsed in the calling process
+MIN_PARALLEL_BYTES = 1 << 20
+
+# Roads per geometry chunk sent to a worker
+ROAD_CHUNK = 50000
+
+
+def build_map_parallel(map_file, workers=None, chunks_per_worker=4):
+    """
+    Build a CityRoadMap from map_file, splitting the parsing and
+    Road geometry over workers processes (os.cpu_count() when None).
+    Return the map and the processing message, like build_map
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    file_size = os.path.getsize(map_file)
+    if workers <= 1 or file_size < MIN_PARALLEL_BYTES:
+        chunks = [parse_chunk(map_file, 0, file_size)]
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        num_chunks = workers * chunks_per_worker
+        bounds = [file_size * i // num_chunks for i in range(num_chunks + 1)]
+        chunks = list(executor.map(parse_chunk, [map_file] * num_chunks,
+                                   bounds[:-1], bounds[1:]))
+
+    # Join the chunks in file order, giving each City its index
+    cities = []
+    city_dict = {}
+    for names, x_coords, y_coords, pops, road_from, road_to in chunks:
+        for i in range(len(names)):
+            city_dict[names[i]] = len(cities)
+            cities.append(City(names[i], x_coords[i], y_coords[i], pops[i]))
+
+    # Resolve the Road end points to City indices
+    from_indices = array('l')
+    to_indices = array('l')
+    for names, x_coords, y_coords, pops, road_from, road_to in chunks:
+        for i in range(len(road_from)):
+            from_indices.append(city_dict[road_from[i]])
+            to_indices.append(city_dict[road_to[i]])
+
+    # Compute the Road geometry, in parallel for big maps
+    x_coords = array('d', [city.get_X() for city in cities])
+    y_coords = array('d', [city.get_Y() for city in cities])
+    road_chunks = []
+    for start in range(0, len(from_indices), ROAD_CHUNK):
+        end = start + ROAD_CHUNK
+        from_chunk = from_indices[start:end]
+        to_chunk = to_indices[start:end]
+        road_chunks.append((array('d', [x_coords[i] for i in from_chunk]),
+                            array('d', [y_coords[i] for i in from_chunk]),
+                            array('d', [x_coords[i] for i in to_chunk]),
+                            array('d', [y_coords[i] for i in to_chunk])))
+
+    if executor is None:
+        geometry = [road_geometry(*coords) for coords in road_chunks]
+    else:
+        geometry = list(executor.map(road_geometry, *zip(*road_chunks)))
+        executor.shutdown()
+
+    roads = []
+    pos = 0
+    for directions, distances in geometry:
+        for i in range(len(directions)):
+            roads.append(Road(cities[from_indices[pos]], cities[to_indices[pos]],
+                              directions[i], distances[i]))
+            pos += 1
+
+    msg = "Processed {} Cities and {} Roads \n".format(len(cities), len(roads))
+    return CityRoadMap(cities, roads), msg
+
+
+def parse_chunk(map_file, start, end):
+    """
+    Parse the records whose lines start in the byte range
+    [start, end) of map_file.  Return the City names, longitudes,
+    latitudes and populations, and the Road from and to City names
+    """
+    names = []
+    x_coords = array('d')
+    y_coords = array('d')
+    pops = array('q')
+    road_from = []
+    road_to = []
+
+    with open(map_file, 'rb') as in_file:
+        # Skip the line that started in the previous range
+        if start > 0:
+            in_file.seek(start - 1)
+            in_file.readline()
+        pos = in_file.tell()
+
+        lines = []
+        while pos < end:
+            line = in_file.readline()
+            if not line:
+                break
+            pos += len(line)
+            lines.append(line.decode("utf-8"))
+
+    for info in csv.reader(lines, delimiter=','):
+        if not info:
+            continue
+        if info[0] == CITY_REC:
+            names.append(info[1])
+            x_coords.append(float(info[2]))
+            y_coords.append(float(info[3]))
+            pops.append(int(info[4]))
+        elif info[0] == ROAD_REC:
+            road_from.append(info[1])
+            road_to.append(info[2])
+
+    return names, x_coords, y_coords, pops, road_from, road_to
+
+
+def road_geometry(from_x, from_y, to_x, to_y):
+    """
+    Return the directions and distances of the Roads
+    between the given coordinate pairs
+    """
+    directions = []
+    distances = array('d')
+    for i in range(len(from_x)):
+        road = Road(City("", from_x[i], from_y[i], 0), City("", to_x[i], to_y[i], 0))
+        directions.append(road.get_direction())
+        distances.append(road.get_distance())
+    return directions, distances
@@ -0,0 +1,240 @@
+from collections import deque
+import csv
+import os
+import select
+import threading
+
+from city import City
+from cityRoadMap import CityRoadMap
+
+"""
+Live ingest of a growing map file (or a pipe) of CITY and ROAD
+records, the format build_map reads.
+
+Each poll reads the records appended since the last one and applies
+them through a MapBuilder (add_vertex, and add_road, which adds the
+Road with add_edge).  The batch is published as a new
+FrozenCityRoadMap, so its indexes and caches (adjacency arrays,
+components, population index, weight layers) are consistent with
+its Cities and Roads.  Queries ask for the current snapshot and run
+against it while the next batch is applied; swapping in a new
+snapshot is a single reference assignment.
+By default one poll publishes one snapshot, however many records
+arrived, so a large backlog costs a single publish; batch_size
+limits the records per snapshot when readers should see a backlog
+come in by steps.
+A ROAD record naming a City not seen yet waits until the City arrives.
+When the file is truncated or replaced (rotated), ingest starts over
+from the first map with the new file; a file missing after it was
+read is taken to be in the middle of a rotation.
+A malformed record, a decode error or a missing file stops the
+background thread: the error is kept, get_error returns it, and
+stop and poll raise it.  The batch holding it is not applied.
+"""
+
+CITY_REC = "CITY"
+ROAD_REC = "ROAD"
+
+
+class MapTail:
+    """
+    This class follows a map file or pipe and keeps
+    a snapshot of the map it describes so far
+    """
+    def __init__(self, source, city_road_map=None, batch_size=None, poll_interval=0.25):
+        """
+        Follow source, a file name or a readable pipe (file object),
+        adding its records to city_road_map (an empty map when None)
+        Instance variables:
+            self.source: file name or file object
+            self.first: FrozenCityRoadMap of city_road_map, where ingest
+                        starts (and starts over when the file is replaced)
+            self.snapshot: FrozenCityRoadMap of the records applied
+            self.version: int: number of snapshots published
+            self.batch_size: int: most records per snapshot, or None
+            self.poll_interval: float: seconds between reads at the end
+            self.offset: int: bytes of the file read so far
+            self.file_id: (device, inode) of the file read, or None
+            self.partial: bytes of a line not yet complete
+            self.pending: Python list of ROAD records waiting for a City
+            self.lines: deque of complete lines not yet applied
+            self.thread: Thread following the source, or None
+            self.stopping: Event telling the thread to stop
+            self.error: Exception that stopped the thread, or None
+        """
+        if city_road_map is None:
+            city_road_map = CityRoadMap([], [])
+        self.source = source
+        self.first = city_road_map.freeze()
+        self.snapshot = self.first
+        self.version = 0
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.offset = 0
+        self.file_id = None
+        self.partial = b""
+        self.pending = []
+        self.lines = deque()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.error = None
+
+    def get_snapshot(self):
+        """
+        Return the latest consistent snapshot of the map
+        """
+        return self.snapshot
+
+    def get_error(self):
+        """
+        Return the error that stopped the background thread, or None
+        """
+        return self.error
+
+    def start(self):
+        """
+        Start following the source in a background thread
+        """
+        self.stopping.clear()
+        self.error = None
+        self.thread = threading.Thread(target=self._follow, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread, after the batch it is applying,
+        and raise the error that stopped it, if any
+        """
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            raise self.error
+
+    def _follow(self):
+        try:
+            while not self.stopping.is_set():
+                if self.poll() == 0:
+                    self.stopping.wait(self.poll_interval)
+        except Exception as error:
+            # Kept for the caller: the snapshot stops changing from here
+            self.error = error
+
+    def poll(self):
+        """
+        Read what has been added to the source, apply it and
+        publish it.  Return the number of records applied
+        """
+        if self.error is not None:
+            raise self.error
+        restarted = self._read()
+        applied = 0
+        while self.lines or restarted:
+            size = len(self.lines)
+            if self.batch_size is not None:
+                size = min(size, self.batch_size)
+            batch = [self.lines.popleft() for count in range(size)]
+            applied += self.apply(batch, restarted)
+            restarted = False
+        return applied
+
+    def _restart(self):
+        """
+        Forget what was read of a file that has been replaced
+        """
+        self.offset = 0
+        self.partial = b""
+        self.pending = []
+        self.lines.clear()
+
+    def _read(self):
+        """
+        Move the complete lines added to the source into self.lines.
+        Return True when the file was replaced and ingest starts over
+        """
+        restarted = False
+        if isinstance(self.source, str):
+            try:
+                in_file = open(self.source, 'rb')
+            except FileNotFoundError:
+                if self.file_id is None:
+                    raise
+                # Rotated away: wait for the new file to appear
+                return False
+            with in_file:
+                stat = os.fstat(in_file.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+                if self.file_id is not None and (file_id != self.file_id
+                                                 or stat.st_size < self.offset):
+                    self._restart()
+                    restarted = True
+                self.file_id = file_id
+                in_file.seek(self.offset)
+                data = in_file.read()
+            self.offset += len(data)
+        else:
+            # A pipe: take only what is there, without blocking
+            fd = self.source.fileno()
+            chunks = []
+            while select.select([fd], [], [], 0)[0]:
+                chunk = os.read(fd, 1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            data = b"".join(chunks)
+
+        data = self.partial + data
+        end = data.rfind(b"\n") + 1
+        self.partial = data[end:]
+        if end:
+            self.lines.extend(data[:end].decode("utf-8").splitlines())
+        return restarted
+
+    def apply(self, lines, restart=False):
+        """
+        Apply the records in lines as one batch, publish the new
+        snapshot and return the number of records applied.
+        With restart, the batch starts over from the first map
+        """
+        if restart:
+            builder = self.first.get_builder()
+        else:
+            builder = self.snapshot.get_builder()
+        roads = list(self.pending)
+        pending = []
+        applied = 0
+
+        for info in csv.reader(lines, delimiter=','):
+            if not info:
+                continue
+            if info[0] == CITY_REC:
+                if len(info) < 5:
+                    raise ValueError("Bad CITY record: " + ",".join(info))
+                # A City already on the map keeps its first record
+                if builder.get_city(info[1]) is None:
+                    try:
+                        city = City(info[1], info[2], info[3], info[4])
+                    except ValueError:
+                        raise ValueError("Bad CITY record: " + ",".join(info))
+                    builder.add_vertex(city)
+                    applied += 1
+            elif info[0] == ROAD_REC:
+                if len(info) < 3:
+                    raise ValueError("Bad ROAD record: " + ",".join(info))
+                roads.append(info)
+
+        for info in roads:
+            from_city = builder.get_city(info[1])
+            to_city = builder.get_city(info[2])
+            if from_city is None or to_city is None:
+                pending.append(info)
+            else:
+                builder.add_road(from_city, to_city)
+                applied += 1
+
+        self.pending = pending
+        if applied or restart:
+            self.snapshot = builder.publish()
+            self.version += 1
+        return applied
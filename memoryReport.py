@@ -0,0 +1,225 @@
+from array import array
+import gc
+import sys
+import tracemalloc
+from types import MappingProxyType
+
+
+class MemoryReport:
+    """
+    This class accounts for the memory held by a CityRoadMap and any
+    GraphTrees built from it.  Every object reachable from the map is
+    counted once (sys.getsizeof), under the first part of the map it
+    is reached from:
+        cities:           the City objects and what they hold
+        roads:            the Road objects and what they hold
+        adjacency lists:  neighbors_dict and the lists of Roads
+        indexes:          vertices list, vert_dict, population index,
+                          ComponentIndex and the other map fields
+        adjacency arrays: the cached AdjacencyArrays
+        trees:            the GraphTrees (only what they add)
+    and under the kind of object it is: objects, dicts, strings,
+    numbers, containers (lists, tuples and sets) or arrays.
+    Cities and the indexes grow with the number of vertices, the
+    other map parts with the number of edges; project() uses that to
+    estimate the memory of a bigger map.
+    """
+    PARTS = ("cities", "roads", "adjacency lists", "indexes",
+             "adjacency arrays", "trees")
+    KINDS = ("objects", "dicts", "strings", "numbers", "containers", "arrays")
+
+    # Parts that grow with the number of vertices; the rest of
+    # the map parts grow with the number of edges
+    VERTEX_PARTS = ("cities", "indexes", "trees")
+
+    def __init__(self, city_road_map, trees=None):
+        """
+        Walk the map and the trees and count their bytes
+        Instance variables:
+            self.num_vertices: int
+            self.num_edges: int
+            self.num_trees: int
+            self.sizes: Python dictionary of bytes, keyed by part,
+                        then by kind
+            self.seen: set of ids of the objects already counted
+            self.build_trace: tracemalloc figures of the map build,
+                              see set_build_trace
+        """
+        if trees is None:
+            trees = []
+        vertices = city_road_map.get_vertices() or []
+
+        self.num_vertices = len(vertices)
+        self.num_edges = 0
+        self.num_trees = len(trees)
+        self.sizes = {part: {kind: 0 for kind in self.KINDS} for part in self.PARTS}
+        self.seen = set()
+        self.build_trace = None
+
+        for city in vertices:
+            self._measure(city, "cities")
+        for city in vertices:
+            roads = city_road_map.get_neighbors(city)
+            self.num_edges += len(roads)
+            for road in roads:
+                self._measure(road, "roads")
+        self._measure(city_road_map.neighbors_dict, "adjacency lists")
+        if city_road_map.adjacency is not None:
+            self._measure(city_road_map.adjacency, "adjacency arrays")
+        self._measure(city_road_map, "indexes")
+        for tree in trees:
+            self._measure(tree, "trees")
+
+    def _measure(self, obj, part):
+        """
+        Count obj and everything reachable from it
+        that has not been counted yet
+        """
+        sizes = self.sizes[part]
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in self.seen or obj is None or obj is True or obj is False:
+                continue
+            kind = self._get_kind(obj)
+            if kind is None:
+                # Classes, functions and modules belong to the program
+                continue
+            self.seen.add(id(obj))
+            sizes[kind] += sys.getsizeof(obj)
+
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, MappingProxyType):
+                stack.extend(gc.get_referents(obj))
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                stack.extend(obj)
+            elif kind == "objects":
+                if hasattr(obj, "__dict__"):
+                    stack.append(obj.__dict__)
+                for cls in type(obj).__mro__:
+                    for slot in getattr(cls, "__slots__", ()):
+                        stack.append(getattr(obj, slot, None))
+
+    def _get_kind(self, obj):
+        """
+        Return the kind obj is counted under, or None
+        when it is not part of the data
+        """
+        if isinstance(obj, (str, bytes)):
+            return "strings"
+        if isinstance(obj, (int, float)):
+            return "numbers"
+        if isinstance(obj, (dict, MappingProxyType)):
+            return "dicts"
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            return "containers"
+        if isinstance(obj, (array, memoryview)):
+            return "arrays"
+        if isinstance(obj, type) or callable(obj) or type(obj).__module__ == "builtins":
+            return None
+        return "objects"
+
+    def get_part_bytes(self, part):
+        """
+        Return the bytes counted under part
+        """
+        return sum(self.sizes[part].values())
+
+    def get_total_bytes(self):
+        """
+        Return the bytes counted in all
+        """
+        return sum(self.get_part_bytes(part) for part in self.PARTS)
+
+    def get_bytes_per_vertex(self):
+        """
+        Return the bytes of the parts growing with
+        the vertices, per vertex
+        """
+        return sum(self.get_part_bytes(part) for part in self.VERTEX_PARTS
+                   if part != "trees") / max(self.num_vertices, 1)
+
+    def get_bytes_per_edge(self):
+        """
+        Return the bytes of the parts growing with the edges, per edge
+        """
+        return sum(self.get_part_bytes(part) for part in self.PARTS
+                   if part not in self.VERTEX_PARTS) / max(self.num_edges, 1)
+
+    def get_bytes_per_tree(self):
+        """
+        Return the bytes of a GraphTree, on average
+        """
+        return self.get_part_bytes("trees") / max(self.num_trees, 1)
+
+    def project(self, num_vertices, num_edges, num_trees=0):
+        """
+        Return the estimated bytes of a map with num_vertices
+        Cities and num_edges Roads holding num_trees GraphTrees
+        """
+        tree_bytes = self.get_bytes_per_tree() / max(self.num_vertices, 1) * num_vertices
+        return (self.get_bytes_per_vertex() * num_vertices
+                + self.get_bytes_per_edge() * num_edges
+                + tree_bytes * num_trees)
+
+    @staticmethod
+    def trace_build(build, *args):
+        """
+        Call build(*args) with tracemalloc running and return its
+        result and the build trace: (bytes still held, peak bytes,
+        list of (file:line, bytes) for the lines allocating most)
+        """
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+
+        result = build(*args)
+
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().compare_to(before, 'lineno')
+        if not was_tracing:
+            tracemalloc.stop()
+
+        top_lines = [(str(stat.traceback[0]), stat.size_diff) for stat in stats[:10]]
+        return result, (current - start_memory, peak - start_memory, top_lines)
+
+    def set_build_trace(self, build_trace):
+        """
+        Keep the trace_build figures of the map build for the report
+        """
+        self.build_trace = build_trace
+
+    def get_report_str(self, target_vertices=None, target_edges=None):
+        """
+        Return a string holding the report, with a projection
+        to the target map size when one is given
+        """
+        report_str = "Memory for {} Cities, {} Roads and {} trees: {} bytes\n".format(
+            self.num_vertices, self.num_edges, self.num_trees, self.get_total_bytes())
+        report_str += "{:<18}".format("Part") + "".join(
+            "{:>12}".format(kind) for kind in self.KINDS) + "{:>12}\n".format("total")
+        for part in self.PARTS:
+            report_str += "{:<18}".format(part) + "".join(
+                "{:>12}".format(self.sizes[part][kind]) for kind in self.KINDS)
+            report_str += "{:>12}\n".format(self.get_part_bytes(part))
+
+        report_str += "Bytes per vertex: {:.1f}\n".format(self.get_bytes_per_vertex())
+        report_str += "Bytes per edge: {:.1f}\n".format(self.get_bytes_per_edge())
+        if self.num_trees:
+            report_str += "Bytes per tree: {:.1f}\n".format(self.get_bytes_per_tree())
+
+        if self.build_trace is not None:
+            held, peak, top_lines = self.build_trace
+            report_str += "Map build: {} bytes held, {} bytes peak\n".format(held, peak)
+            for line, size in top_lines:
+                report_str += "    {:>10} bytes  {}\n".format(size, line)
+
+        if target_vertices is not None and target_edges is not None:
+            report_str += "Projected for {} Cities and {} Roads: {:.0f} bytes\n".format(
+                target_vertices, target_edges, self.project(target_vertices, target_edges))
+        return report_str
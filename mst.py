@@ -1,34 +1,46 @@
-from graphTree import GraphTree
-
-
-class MST(GraphTree):
-    """
-    This class presents a tree for storing the MST
-    """
-    def __init__(self, root, search_order, parents, vertices, edges, total_weight):
-        """
-        Create an MST
-        Instance variables: total_weight: int
-        """
-        super().__init__(root, search_order, parents, vertices)
-        self.edges = edges
-        self.total_weight = total_weight
-
-    def get_total_weight(self):
-        """
-        Return total weight of MST
-        """
-        return self.total_weight
-
-    def get_mst_edge_str(self):
-        """
-        Return a string holding path of edges from the root
-        to the starting vertex given when the tree was built
-        """
-        edge_str = "Edges:\n"
-        for edge in self.edges:
-            edge_str += ("[ " + str(edge) + " ]\n")
-
-        edge_str += '\n'
-
-        return edge_str
+from graphTree import GraphTree
+
+
+class MST(GraphTree):
+    """
+    This class presents a tree for storing the MST
+    """
+    def __init__(self, root, search_order, parents, vertices, edges, total_weight,
+                 roots=None):
+        """
+        Create an MST
+        Instance variables: total_weight: int
+                            roots: Python list of tree roots, more than
+                                   one when the MST is a spanning forest
+        """
+        super().__init__(root, search_order, parents, vertices)
+        self.edges = edges
+        self.total_weight = total_weight
+        if roots is None:
+            roots = [root]
+        self.roots = roots
+
+    def get_total_weight(self):
+        """
+        Return total weight of MST
+        """
+        return self.total_weight
+
+    def get_roots(self):
+        """
+        Return the list of tree roots, one per component spanned
+        """
+        return self.roots
+
+    def get_mst_edge_str(self):
+        """
+        Return a string holding path of edges from the root
+        to the starting vertex given when the tree was built
+        """
+        edge_str = "Edges:\n"
+        for edge in self.edges:
+            edge_str += ("[ " + str(edge) + " ]\n")
+
+        edge_str += '\n'
+
+        return edge_str
@@ -0,0 +1,128 @@
+from comparable import Comparable
+from edge import Edge
+from road import Road
+
+"""
+Undirected Road storage: the two directions of a road share one
+RoadGeometry holding the distance and the compass bearing of the
+road, and each direction is a thin RoadLink pointing at it.
+The bearing of the way back is the opposite compass point: turning
+the road around negates both coordinate differences, which moves it
+to the opposite quadrant at the same angle (see road.py).
+"""
+
+# The 16 compass points, clockwise from North, so the
+# opposite of the point at i is the point at (i + 8) % 16
+COMPASS_POINTS = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                  'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+
+
+class RoadGeometry:
+    """
+    This class holds what both directions of a road share
+    Instance variables:
+        self.distance: float: miles
+        self.bearing: int: index in COMPASS_POINTS of the direction
+                      of travel from the first City to the second,
+                      -1 when it has none
+    """
+    __slots__ = ('distance', 'bearing')
+
+    def __init__(self, distance, direction):
+        """
+        Create the geometry for a road first traveled in direction
+        """
+        self.distance = distance
+        if direction in COMPASS_POINTS:
+            self.bearing = COMPASS_POINTS.index(direction)
+        else:
+            self.bearing = -1
+
+
+class RoadLink(Edge, Comparable):
+    """
+    This class is one direction of an undirected road.  It behaves
+    like a Road (same methods and text) but keeps no geometry of its
+    own: the distance and direction come from the shared RoadGeometry
+    """
+    def __init__(self, from_city, to_city, geometry, reverse=False):
+        """
+        Create the link from from_city to to_city over geometry,
+        which was computed for the opposite direction when reverse
+        """
+        self.from_vertex = from_city
+        self.to_vertex = to_city
+        self.geometry = geometry
+        self.reverse = reverse
+
+    @property
+    def from_city(self):
+        return self.from_vertex
+
+    @property
+    def to_city(self):
+        return self.to_vertex
+
+    @property
+    def weight(self):
+        return self.geometry.distance
+
+    @property
+    def dist(self):
+        return self.geometry.distance
+
+    @property
+    def direction(self):
+        bearing = self.geometry.bearing
+        if bearing == -1:
+            return None
+        if self.reverse:
+            bearing = (bearing + 8) % 16
+        return COMPASS_POINTS[bearing]
+
+    def set_weight(self, weight):
+        """
+        Sets the weight, for both directions of the road
+        """
+        self.geometry.distance = weight
+
+    def get_distance(self):
+        """
+        Return distance (weight)
+        """
+        return self.geometry.distance
+
+    def get_direction(self):
+        """
+        Return direction
+        """
+        return self.direction
+
+    def compare(self, other_road):
+        """
+        Use the Road weight (distance) for comparison
+        """
+        return self.get_distance() - other_road.get_distance()
+
+    def __str__(self):
+        """
+        Return road information as a string
+        """
+        return self.from_city.name + " to " + self.to_city.name + " traveling " + self.direction + " for " + str(round(self.dist, 2)) + " miles"
+
+
+def link_road(unpaired, from_city, to_city, from_index, to_index):
+    """
+    Return the RoadLink from from_city to to_city.  unpaired is a
+    dictionary of the RoadGeometry of roads added in one direction
+    only, keyed by (from index, to index): the way back of one of
+    those reuses its geometry, anything else gets new geometry
+    """
+    geometry = unpaired.pop((to_index, from_index), None)
+    if geometry is not None:
+        return RoadLink(from_city, to_city, geometry, reverse=True)
+
+    first = Road(from_city, to_city)
+    geometry = RoadGeometry(first.get_distance(), first.get_direction())
+    unpaired[(from_index, to_index)] = geometry
+    return RoadLink(from_city, to_city, geometry)
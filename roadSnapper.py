@@ -0,0 +1,328 @@
+from array import array
+import math
+import sys
+
+"""
+Snapping GPS points to Roads, and routing between snapped points.
+
+Every Road is a straight segment between its two Cities.  The
+segments are kept in flat coordinate arrays and filed in a uniform
+grid: each grid cell lists the segments whose bounding box overlaps
+it.  A point is snapped by scanning the cells in growing square rings
+around it until no unscanned cell can hold a closer segment.
+Coordinates are projected by scaling longitude with the cosine of the
+map's mean latitude, so that one unit is about the same distance
+north-south and east-west (69 miles per degree of latitude).
+The two directions of a road share one segment.
+"""
+
+MILES_PER_DEGREE = 69.0
+
+
+class RoadPoint:
+    """
+    This class is a point on a Road: the Road, how far along it
+    the point is, and how far the snapped point was from it
+    Instance variables:
+        self.road: Road the point is on
+        self.fraction: float: 0.0 at the from City, 1.0 at the to City
+        self.offset: float: miles between the snapped point and the Road
+    """
+    def __init__(self, road, fraction, offset):
+        self.road = road
+        self.fraction = fraction
+        self.offset = offset
+
+    def get_road(self):
+        """
+        Return the Road
+        """
+        return self.road
+
+    def get_fraction(self):
+        """
+        Return how far along the Road the point is, 0.0 to 1.0
+        """
+        return self.fraction
+
+    def get_offset(self):
+        """
+        Return the miles between the snapped point and the Road
+        """
+        return self.offset
+
+    def __str__(self):
+        """
+        Return the point as a string
+        """
+        return (str(round(self.fraction * 100, 1)) + "% of the way from "
+                + self.road.from_city.name + " to " + self.road.to_city.name
+                + " (" + str(round(self.offset, 2)) + " miles off the road)")
+
+
+class RoadSnapper:
+    """
+    This class snaps points (longitude, latitude) onto the Roads of
+    a CityRoadMap and finds shortest routes between snapped points,
+    starting and ending part way along a Road
+    """
+    def __init__(self, city_road_map, cell_size=None):
+        """
+        Build the segment grid for city_road_map.  cell_size is the
+        grid spacing in projected degrees, by default the mean length
+        of a segment
+        Instance variables:
+            self.city_road_map: CityRoadMap
+            self.x_scale: float: projection factor for longitudes
+            self.from_x, self.from_y, self.to_x, self.to_y: arrays of
+                the projected segment end points
+            self.roads: Python list of the Road of each segment
+            self.reverse: Python dictionary of the Road back the
+                          other way, keyed by id of the Road
+            self.cell_size: float
+            self.cells: Python dictionary of arrays of segment numbers,
+                        keyed by (column, row)
+            self.min_col, self.max_col, self.min_row, self.max_row:
+                int: extent of the filled cells
+        """
+        self.city_road_map = city_road_map
+        vertices = city_road_map.get_vertices()
+        mean_lat = sum(city.get_Y() for city in vertices) / max(len(vertices), 1)
+        self.x_scale = math.cos(math.radians(mean_lat))
+
+        self.from_x = array('d')
+        self.from_y = array('d')
+        self.to_x = array('d')
+        self.to_y = array('d')
+        self.roads = []
+        self.reverse = {}
+
+        # One segment per pair of Cities; the way back is remembered
+        pair_roads = {}
+        for city in vertices:
+            for road in city_road_map.get_neighbors(city):
+                from_name = road.from_city.get_name()
+                to_name = road.to_city.get_name()
+                back = pair_roads.get((to_name, from_name))
+                if back is not None:
+                    self.reverse[id(back)] = road
+                    self.reverse[id(road)] = back
+                    continue
+                pair_roads[(from_name, to_name)] = road
+                self.from_x.append(road.from_city.get_X() * self.x_scale)
+                self.from_y.append(road.from_city.get_Y())
+                self.to_x.append(road.to_city.get_X() * self.x_scale)
+                self.to_y.append(road.to_city.get_Y())
+                self.roads.append(road)
+
+        num_segments = len(self.roads)
+        if cell_size is None:
+            total = 0.0
+            for seg in range(num_segments):
+                total += math.hypot(self.to_x[seg] - self.from_x[seg],
+                                    self.to_y[seg] - self.from_y[seg])
+            cell_size = total / max(num_segments, 1) or 1.0
+        self.cell_size = cell_size
+
+        self.cells = {}
+        for seg in range(num_segments):
+            min_col, min_row = self._get_cell(min(self.from_x[seg], self.to_x[seg]),
+                                              min(self.from_y[seg], self.to_y[seg]))
+            max_col, max_row = self._get_cell(max(self.from_x[seg], self.to_x[seg]),
+                                              max(self.from_y[seg], self.to_y[seg]))
+            for col in range(min_col, max_col + 1):
+                for row in range(min_row, max_row + 1):
+                    self.cells.setdefault((col, row), array('l')).append(seg)
+
+        cols = [col for col, row in self.cells] or [0]
+        rows = [row for col, row in self.cells] or [0]
+        self.min_col, self.max_col = min(cols), max(cols)
+        self.min_row, self.max_row = min(rows), max(rows)
+
+    def _get_cell(self, x, y):
+        """
+        Return the (column, row) of the cell holding projected point x, y
+        """
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def _get_ring(self, col, row, ring):
+        """
+        Return the filled cells on the square ring ring cells
+        away from the cell (col, row)
+        """
+        if ring == 0:
+            keys = [(col, row)]
+        else:
+            keys = [(c, row - ring) for c in range(col - ring, col + ring + 1)]
+            keys += [(c, row + ring) for c in range(col - ring, col + ring + 1)]
+            keys += [(col - ring, r) for r in range(row - ring + 1, row + ring)]
+            keys += [(col + ring, r) for r in range(row - ring + 1, row + ring)]
+        return [self.cells[key] for key in keys if key in self.cells]
+
+    def _nearest(self, x, y, segments, best):
+        """
+        Return the best of best and the segments for projected point
+        x, y, as (squared distance, segment, fraction)
+        """
+        from_x = self.from_x
+        from_y = self.from_y
+        to_x = self.to_x
+        to_y = self.to_y
+        best_dist, best_seg, best_fraction = best
+        for seg in segments:
+            ax = from_x[seg]
+            ay = from_y[seg]
+            dx = to_x[seg] - ax
+            dy = to_y[seg] - ay
+            length = dx * dx + dy * dy
+            if length > 0:
+                fraction = ((x - ax) * dx + (y - ay) * dy) / length
+                fraction = min(max(fraction, 0.0), 1.0)
+            else:
+                fraction = 0.0
+            px = ax + fraction * dx - x
+            py = ay + fraction * dy - y
+            dist = px * px + py * py
+            if dist < best_dist:
+                best_dist = dist
+                best_seg = seg
+                best_fraction = fraction
+        return best_dist, best_seg, best_fraction
+
+    def snap(self, lon, lat):
+        """
+        Return the RoadPoint on the Road nearest to (lon, lat),
+        or None when the map has no Roads
+        """
+        x = lon * self.x_scale
+        y = lat
+        col, row = self._get_cell(x, y)
+        max_ring = max(abs(col - self.min_col), abs(col - self.max_col),
+                       abs(row - self.min_row), abs(row - self.max_row))
+
+        best = (float("inf"), -1, 0.0)
+        for ring in range(max_ring + 1):
+            # Every cell further out is at least ring cells away
+            limit = ring * self.cell_size - self.cell_size
+            if limit > 0 and best[0] <= limit * limit:
+                break
+            for segments in self._get_ring(col, row, ring):
+                best = self._nearest(x, y, segments, best)
+
+        return self._make_point(best)
+
+    def _make_point(self, best):
+        """
+        Return the RoadPoint for a _nearest result, or None
+        when no segment was found
+        """
+        dist, seg, fraction = best
+        if seg == -1:
+            return None
+        return RoadPoint(self.roads[seg], fraction, math.sqrt(dist) * MILES_PER_DEGREE)
+
+    def snap_all(self, points):
+        """
+        Return the RoadPoints for a list of (lon, lat) points.
+        Points are handled cell by cell, so the nearby segments of a
+        cell are gathered once for all the points falling in it
+        """
+        by_cell = {}
+        for num, (lon, lat) in enumerate(points):
+            by_cell.setdefault(self._get_cell(lon * self.x_scale, lat), []).append(num)
+
+        results = [None] * len(points)
+        for (col, row), nums in by_cell.items():
+            # Segments in the 3 x 3 block of cells around this one:
+            # enough for every point whose nearest Road is that close
+            nearby = set()
+            for ring in (0, 1):
+                for segments in self._get_ring(col, row, ring):
+                    nearby.update(segments)
+            nearby = array('l', sorted(nearby))
+
+            for num in nums:
+                lon, lat = points[num]
+                x = lon * self.x_scale
+                best = self._nearest(x, lat, nearby, (float("inf"), -1, 0.0))
+                # Closer than a cell: nothing outside the block can beat it
+                if best[1] != -1 and best[0] <= self.cell_size * self.cell_size:
+                    results[num] = self._make_point(best)
+                else:
+                    results[num] = self.snap(lon, lat)
+        return results
+
+    def _get_ends(self, point, leaving):
+        """
+        Return the Cities a route can leave (or reach) point by, as
+        a list of (City index, cost along the Road, Road traveled
+        or None)
+        """
+        road = point.road
+        graph = self.city_road_map
+        ends = []
+        if leaving:
+            ends.append((graph.get_vert_index(road.to_city),
+                         (1.0 - point.fraction) * road.get_weight(), road))
+            back = self.reverse.get(id(road))
+            if back is not None:
+                ends.append((graph.get_vert_index(road.from_city),
+                             point.fraction * back.get_weight(), back))
+        else:
+            ends.append((graph.get_vert_index(road.from_city),
+                         point.fraction * road.get_weight(), road))
+            back = self.reverse.get(id(road))
+            if back is not None:
+                ends.append((graph.get_vert_index(road.to_city),
+                             (1.0 - point.fraction) * back.get_weight(), back))
+        return ends
+
+    def get_route(self, start, finish):
+        """
+        Return the shortest route between two RoadPoints as a tuple
+        (cost, list of Roads traveled, first to last), where the
+        first and last Roads are only traveled in part; the cost and
+        list are sys.maxsize and None when finish cannot be reached
+        """
+        adjacency = self.city_road_map.get_adjacency_arrays()
+
+        # Both on one road: straight along it, when going that way
+        best_cost = sys.maxsize
+        best_roads = None
+        for road, start_fraction, finish_fraction in (
+                (start.road, start.fraction, finish.fraction),
+                (self.reverse.get(id(start.road)), 1.0 - start.fraction, 1.0 - finish.fraction)):
+            if road is None:
+                continue
+            if finish.road is start.road or finish.road is self.reverse.get(id(start.road)):
+                if finish.road is not start.road:
+                    finish_fraction = 1.0 - finish_fraction
+                if finish_fraction >= start_fraction:
+                    cost = (finish_fraction - start_fraction) * road.get_weight()
+                    if cost < best_cost:
+                        best_cost = cost
+                        best_roads = [road]
+
+        starts = self._get_ends(start, True)
+        finishes = self._get_ends(finish, False)
+        cost, start_num, finish_num, path = adjacency.multi_source_path(
+            [(index, cost) for index, cost, road in starts],
+            [(index, cost) for index, cost, road in finishes], best_cost)
+        if path is None:
+            return best_cost, best_roads
+
+        roads = [starts[start_num][2]] + [adjacency.edges[pos] for pos in path]
+        roads.append(finishes[finish_num][2])
+        return cost, roads
+
+    def get_point_route(self, from_lon, from_lat, to_lon, to_lat):
+        """
+        Snap both points and return the route between them as
+        get_route does, plus the two RoadPoints
+        """
+        start = self.snap(from_lon, from_lat)
+        finish = self.snap(to_lon, to_lat)
+        if start is None or finish is None:
+            return sys.maxsize, None, start, finish
+        cost, roads = self.get_route(start, finish)
+        return cost, roads, start, finish
@@ -0,0 +1,134 @@
+from array import array
+import sys
+import threading
+
+
+class SearchWorkspace:
+    """
+    This class holds the scratch lists a graph search needs (visited
+    marks, costs and parents, one entry per vertex) so they can be
+    reused from one search to the next instead of being allocated
+    for every query.
+    Rather than clearing the lists between searches, every entry
+    carries the epoch (search number) in which it was last written.
+    Starting a new search just moves to the next epoch, so every
+    entry written by an earlier search reads as unvisited / unreached.
+    A workspace serves one search at a time; use get_workspace to
+    get the one belonging to the current thread.
+    """
+    # Epoch at which the stamps are wiped and counting starts over
+    MAX_EPOCH = 2 ** 31 - 1
+
+    # Marks are single bytes, so they are wiped every MAX_MARK searches
+    MAX_MARK = 255
+
+    def __init__(self, size=0):
+        """
+        Create a workspace for graphs of up to size vertices
+        Instance variables:
+            self.epoch: int: number of the current search
+            self.visit_stamps: array of int: epoch each vertex was visited
+            self.reach_stamps: array of int: epoch each cost was set
+            self.cost: array of float: cost of each reached vertex
+            self.parents: array of int: parent index of each reached vertex
+            self.mark: int: number of the current search, 1 to MAX_MARK
+            self.marks: bytearray: mark each vertex was visited with,
+                        a compact visited bitmap for traversals
+        """
+        self.epoch = 0
+        self.visit_stamps = array('l', [0]) * size
+        self.reach_stamps = array('l', [0]) * size
+        self.cost = array('d', [0.0]) * size
+        self.parents = array('l', [-1]) * size
+        self.mark = 0
+        self.marks = bytearray(size)
+
+    def get_capacity(self):
+        """
+        Return the number of vertices the workspace can hold
+        """
+        return len(self.visit_stamps)
+
+    def reset(self, size):
+        """
+        Start a new search over a graph of size vertices,
+        growing the lists if they are too short.  O(1) unless
+        the lists grow or the epoch wraps around
+        """
+        extra = size - len(self.visit_stamps)
+        if extra > 0:
+            self.visit_stamps.extend(array('l', [0]) * extra)
+            self.reach_stamps.extend(array('l', [0]) * extra)
+            self.cost.extend(array('d', [0.0]) * extra)
+            self.parents.extend(array('l', [-1]) * extra)
+            self.marks.extend(bytes(extra))
+
+        self.epoch += 1
+        if self.epoch == self.MAX_EPOCH:
+            capacity = len(self.visit_stamps)
+            self.visit_stamps = array('l', [0]) * capacity
+            self.reach_stamps = array('l', [0]) * capacity
+            self.epoch = 1
+
+        self.mark += 1
+        if self.mark > self.MAX_MARK:
+            self.marks = bytearray(len(self.marks))
+            self.mark = 1
+
+    def is_visited(self, index):
+        """
+        Return True if the vertex was visited in this search
+        """
+        return self.visit_stamps[index] == self.epoch
+
+    def visit(self, index):
+        """
+        Mark the vertex as visited in this search
+        """
+        self.visit_stamps[index] = self.epoch
+
+    def is_reached(self, index):
+        """
+        Return True if the vertex was given a cost in this search
+        """
+        return self.reach_stamps[index] == self.epoch
+
+    def set_cost(self, index, cost, parent=-1):
+        """
+        Set the cost and parent index of the vertex for this search
+        """
+        self.reach_stamps[index] = self.epoch
+        self.cost[index] = cost
+        self.parents[index] = parent
+
+    def get_cost(self, index):
+        """
+        Return the cost of the vertex, sys.maxsize if not reached
+        """
+        if self.reach_stamps[index] == self.epoch:
+            return self.cost[index]
+        return sys.maxsize
+
+    def get_parent(self, index):
+        """
+        Return the parent index of the vertex, -1 if not reached
+        """
+        if self.reach_stamps[index] == self.epoch:
+            return self.parents[index]
+        return -1
+
+
+_thread_workspaces = threading.local()
+
+
+def get_workspace(size):
+    """
+    Return the current thread's SearchWorkspace,
+    reset for a new search over size vertices
+    """
+    workspace = getattr(_thread_workspaces, "workspace", None)
+    if workspace is None:
+        workspace = SearchWorkspace(size)
+        _thread_workspaces.workspace = workspace
+    workspace.reset(size)
+    return workspace
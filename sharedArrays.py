@@ -0,0 +1,71 @@
+from array import array
+from multiprocessing import shared_memory
+
+
+class SharedArrays:
+    """
+    This class keeps typed arrays in multiprocessing shared memory,
+    so worker processes can read them without a copy per task.
+    The process that creates the arrays owns the memory; workers
+    attach to it with the specs of the owner (see get_specs) and
+    see every later write the owner makes.
+    """
+    def __init__(self):
+        """
+        Create an empty set of shared arrays
+        Instance variables:
+            self.blocks: Python list of SharedMemory blocks
+            self.views: Python list of memoryviews, one per block,
+                        cast to the type of the array it holds
+            self.owner: bool: True when this process created the blocks
+        """
+        self.blocks = []
+        self.views = []
+        self.owner = True
+
+    def add(self, values):
+        """
+        Copy an array into a new shared memory block
+        and return a memoryview of it
+        """
+        num_bytes = len(values) * values.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(num_bytes, 1))
+        view = block.buf[:num_bytes].cast(values.typecode)
+        view[:] = values
+        self.blocks.append(block)
+        self.views.append(view)
+        return view
+
+    def get_specs(self):
+        """
+        Return the (block name, typecode, length) of each array,
+        to hand to attach in a worker process
+        """
+        return [(block.name, view.format, len(view))
+                for block, view in zip(self.blocks, self.views)]
+
+    @staticmethod
+    def attach(specs):
+        """
+        Return SharedArrays viewing the arrays of another process
+        """
+        shared = SharedArrays()
+        shared.owner = False
+        for name, typecode, length in specs:
+            block = shared_memory.SharedMemory(name=name)
+            shared.blocks.append(block)
+            shared.views.append(block.buf[:length * array(typecode).itemsize].cast(typecode))
+        return shared
+
+    def close(self):
+        """
+        Release the views and, in the owner, free the memory
+        """
+        for view in self.views:
+            view.release()
+        for block in self.blocks:
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.views = []
+        self.blocks = []
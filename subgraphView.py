@@ -0,0 +1,115 @@
+from array import array
+
+from adjacencyArrays import AdjacencyArrays
+from cityRoadMap import CityRoadMap
+from componentIndex import ComponentIndex
+
+"""
+Subgraph views of a CityRoadMap.
+
+A view holds only some of the map's Cities and the Roads running
+between them, with the Cities numbered 0, 1, ... in map order.
+Nothing is copied but indices: the view's vertices list, adjacency
+lists and AdjacencyArrays refer to the map's own City and Road
+objects, and the arrays are filled by remapping the map's arrays
+(a Road is kept when both its ends are in the view), weight layers
+included.  A view is a CityRoadMap, so every traversal and query of
+the map runs on it unchanged.
+A view shows the map as it was when the view was made; make a new
+one after the map changes.
+"""
+
+
+class SubgraphView(CityRoadMap):
+    """
+    This class is a read-only CityRoadMap holding part of another.
+    add_vertex, add_edge and add_road raise TypeError
+    """
+    def __init__(self, parent, cities):
+        """
+        Create the view of parent holding the given Cities
+        (names, City objects or vertex indices)
+        Instance variables (besides those of CityRoadMap):
+            self.parent: CityRoadMap viewed
+            self.parent_indices: array of the parent index of each
+                                 vertex of the view
+        """
+        parent_adjacency = parent.get_adjacency_arrays()
+        size = parent.get_size()
+
+        # Parent index -> view index, -1 when left out
+        local = array('l', [-1]) * size
+        for index in parent.get_city_indices(cities):
+            local[index] = 0
+        self.parent = parent
+        self.parent_indices = array('l', [index for index in range(size) if local[index] != -1])
+        for view_index, index in enumerate(self.parent_indices):
+            local[index] = view_index
+
+        parent_vertices = parent.get_vertices()
+        self.vertices = [parent_vertices[index] for index in self.parent_indices]
+        self.vert_dict = {}
+        self.neighbors_dict = {}
+        self.components = ComponentIndex(len(self.vertices))
+        self.weight_layers = dict(parent.weight_layers)
+        self.undirected = parent.undirected
+        self.unpaired = {}
+
+        # Keep the Roads with both ends in the view, in array order
+        offsets = parent_adjacency.offsets
+        targets = parent_adjacency.targets
+        layers = [(name, parent_adjacency.get_layer(name).weights, array('d'))
+                  for name in self.weight_layers]
+        adjacency = AdjacencyArrays()
+        for view_index, index in enumerate(self.parent_indices):
+            city = self.vertices[view_index]
+            roads = []
+            for pos in range(offsets[index], offsets[index + 1]):
+                target = local[targets[pos]]
+                if target == -1:
+                    continue
+                roads.append(parent_adjacency.edges[pos])
+                adjacency.targets.append(target)
+                adjacency.weights.append(parent_adjacency.weights[pos])
+                for name, parent_weights, weights in layers:
+                    weights.append(parent_weights[pos])
+                self.components.union(view_index, target)
+            adjacency.edges.extend(roads)
+            adjacency.offsets.append(len(adjacency.targets))
+            self.vert_dict[city.get_name()] = view_index
+            self.neighbors_dict[city.get_name()] = roads
+        for name, parent_weights, weights in layers:
+            adjacency.add_layer(name, weights)
+        self.adjacency = adjacency
+
+        # The parent's population order, restricted to the view
+        self.pop_order = [local[index] for index in parent.pop_order if local[index] != -1]
+        self.pop_keys = [self.vertices[index].get_pop() for index in self.pop_order]
+
+    @staticmethod
+    def in_box(parent, min_x, min_y, max_x, max_y):
+        """
+        Return the view of parent holding the Cities whose longitude
+        lies in [min_x, max_x] and latitude in [min_y, max_y]
+        """
+        indices = [index for index, city in enumerate(parent.get_vertices())
+                   if min_x <= city.get_X() <= max_x and min_y <= city.get_Y() <= max_y]
+        return SubgraphView(parent, indices)
+
+    def get_parent_index(self, index):
+        """
+        Return the parent index of the view's vertex at index
+        """
+        return self.parent_indices[index]
+
+    def add_vertex(self, city):
+        raise TypeError("A SubgraphView cannot be changed: change its parent map")
+
+    def add_edge(self, edge):
+        raise TypeError("A SubgraphView cannot be changed: change its parent map")
+
+    def add_road(self, from_city, to_city):
+        raise TypeError("A SubgraphView cannot be changed: change its parent map")
+
+    def add_weight_layer(self, name, weight_of):
+        raise TypeError("A SubgraphView cannot be changed: change its parent map")
@@ -0,0 +1,256 @@
+from collections import deque
+import sys
+import time
+
+from edge import Edge
+from graph import Graph
+
+
+class TourPlanner:
+    """
+    This class plans a round trip through a list of Cities on a
+    CityRoadMap, visiting each one once and returning to the start.
+    1. The road distances between the stops come from the map's
+       distance matrix, which is cached for the stop set.
+    2. An MST of the stops (get_min_spanning_tree over the complete
+       graph of road distances) is walked in preorder to give a
+       starting tour at most twice the optimal length.
+    3. The tour is improved with 2-opt and Or-opt moves.  Each stop
+       only tries moves toward its nearest neighbors, and stops whose
+       neighborhood has not changed are skipped (don't-look bits),
+       until no move helps or the time budget runs out.
+    Roads are taken to run both ways, as they do in the map files.
+    """
+    def __init__(self, city_road_map, num_neighbors=8):
+        """
+        Create a planner for the map
+        Instance variables:
+            self.city_road_map: CityRoadMap
+            self.num_neighbors: int: length of each neighbor list
+            self.matrix_cache: Python dictionary of distance matrices,
+                               keyed by the tuple of stop indices
+        """
+        self.city_road_map = city_road_map
+        self.num_neighbors = num_neighbors
+        self.matrix_cache = {}
+
+    def get_distances(self, indices):
+        """
+        Return the road distance matrix between the stops
+        with the given vertex indices, computing it only once
+        """
+        key = tuple(indices)
+        if key not in self.matrix_cache:
+            self.matrix_cache[key] = self.city_road_map.get_distance_matrix(indices, indices)
+        return self.matrix_cache[key]
+
+    def plan_tour(self, cities, time_budget=1.0):
+        """
+        Return a round trip through the Cities (names or City objects)
+        as a tuple: (list of Cities in visiting order, total miles).
+        The trip starts and ends at the first City.  Local search
+        stops after time_budget seconds.  No Cities give an empty
+        trip of 0 miles.  A City listed more than once is visited once
+        """
+        deadline = time.perf_counter() + time_budget
+
+        # Drop repeated stops, keeping the first City first: the stop
+        # graph below knows its Cities by name, so each stop must be
+        # a different City
+        indices = list(dict.fromkeys(self.city_road_map.get_city_indices(cities)))
+        if not indices:
+            return [], 0
+        vertices = self.city_road_map.get_vertices()
+        stops = [vertices[index] for index in indices]
+        dist = self.get_distances(indices)
+
+        for row in dist:
+            if sys.maxsize in row:
+                raise ValueError("Some of the cities cannot reach each other")
+
+        if len(stops) <= 3:
+            tour = list(range(len(stops)))
+        else:
+            tour = self.mst_tour(stops, dist)
+            neighbors = self.get_neighbor_lists(dist)
+            tour = self.improve(tour, dist, neighbors, deadline)
+
+        # Turn the tour so it starts from the first City
+        start = tour.index(0)
+        tour = tour[start:] + tour[:start]
+
+        return [stops[i] for i in tour], self.get_tour_length(tour, dist)
+
+    def get_tour_length(self, tour, dist):
+        """
+        Return the length of the round trip
+        """
+        total = 0
+        for i in range(len(tour)):
+            total += dist[tour[i - 1]][tour[i]]
+        return total
+
+    def mst_tour(self, stops, dist):
+        """
+        Return the preorder walk of the MST of the stops
+        as a list of stop numbers
+        """
+        # Complete graph of the stops, weighted by road distance
+        edges = []
+        for i in range(len(stops)):
+            for j in range(len(stops)):
+                if i != j:
+                    edges.append(Edge(stops[i], stops[j], dist[i][j]))
+        stop_graph = Graph(list(stops), edges)
+        mst = stop_graph.get_min_spanning_tree(stops[0])
+
+        # Children in the order the MST found them
+        children = [[] for stop in stops]
+        for vertex in mst.get_search_order():
+            parent = mst.get_parent(vertex)
+            if parent is not None:
+                children[stop_graph.get_vert_index(parent)].append(
+                    stop_graph.get_vert_index(vertex))
+
+        tour = []
+        stack = [0]
+        while stack:
+            stop = stack.pop()
+            tour.append(stop)
+            stack.extend(reversed(children[stop]))
+        return tour
+
+    def get_neighbor_lists(self, dist):
+        """
+        Return, for each stop, its nearest other stops, nearest first
+        """
+        neighbors = []
+        for i in range(len(dist)):
+            others = sorted((j for j in range(len(dist)) if j != i),
+                            key=lambda j: dist[i][j])
+            neighbors.append(others[:self.num_neighbors])
+        return neighbors
+
+    def improve(self, tour, dist, neighbors, deadline):
+        """
+        Improve the tour with 2-opt and Or-opt moves until
+        no move helps or the deadline passes
+        """
+        num_stops = len(tour)
+        pos = [0] * num_stops
+        for i in range(num_stops):
+            pos[tour[i]] = i
+
+        # Stops whose don't-look bit is off, waiting to be tried
+        queue = deque(tour)
+        queued = [True] * num_stops
+
+        while queue:
+            if time.perf_counter() > deadline:
+                break
+            stop = queue.popleft()
+            queued[stop] = False
+
+            changed = self.try_two_opt(stop, tour, pos, dist, neighbors)
+            if changed is None:
+                changed = self.try_or_opt(stop, tour, pos, dist, neighbors)
+                if changed is not None:
+                    for i in range(num_stops):
+                        pos[tour[i]] = i
+
+            # Wake up the stops at the ends of the changed edges
+            if changed is not None:
+                for other in changed:
+                    if not queued[other]:
+                        queued[other] = True
+                        queue.append(other)
+
+        return tour
+
+    def try_two_opt(self, a, tour, pos, dist, neighbors):
+        """
+        Look for a 2-opt move replacing an edge at a with an edge
+        from a to one of its neighbors.  Apply the first one that
+        shortens the tour and return the stops touched, else None
+        """
+        num_stops = len(tour)
+        for forward in (True, False):
+            if forward:
+                b = tour[(pos[a] + 1) % num_stops]
+            else:
+                b = tour[pos[a] - 1]
+            for c in neighbors[a]:
+                # Neighbors are sorted, so no later one can help
+                if dist[a][c] >= dist[a][b]:
+                    break
+                if forward:
+                    d = tour[(pos[c] + 1) % num_stops]
+                else:
+                    d = tour[pos[c] - 1]
+                if c == b or d == a:
+                    continue
+
+                delta = dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+                if delta < -1e-9:
+                    # Edges (a, b) and (c, d) become (a, c) and (b, d)
+                    if forward:
+                        self.reverse(tour, pos, pos[a], pos[c])
+                    else:
+                        self.reverse(tour, pos, pos[b], pos[d])
+                    return (a, b, c, d)
+        return None
+
+    def reverse(self, tour, pos, i, j):
+        """
+        Reverse the tour between positions i + 1 and j (wrapping
+        around), which swaps edge (tour[i], tour[i + 1]) and edge
+        (tour[j], tour[j + 1]) for (tour[i], tour[j]) and
+        (tour[i + 1], tour[j + 1])
+        """
+        num_stops = len(tour)
+        start = (i + 1) % num_stops
+        length = (j - i) % num_stops
+        for k in range(length // 2):
+            left = (start + k) % num_stops
+            right = (start + length - 1 - k) % num_stops
+            tour[left], tour[right] = tour[right], tour[left]
+            pos[tour[left]] = left
+            pos[tour[right]] = right
+
+    def try_or_opt(self, stop, tour, pos, dist, neighbors):
+        """
+        Look for an Or-opt move taking the segment of 1 to 3 stops
+        starting at stop and putting it, either way round, next to
+        one of stop's neighbors.  Apply the first one that shortens
+        the tour and return the stops touched, else None
+        """
+        num_stops = len(tour)
+        for length in (1, 2, 3):
+            if length > num_stops - 3:
+                break
+            start = pos[stop]
+            segment = [tour[(start + k) % num_stops] for k in range(length)]
+            first = segment[0]
+            last = segment[-1]
+            prev = tour[start - 1]
+            after = tour[(start + length) % num_stops]
+            removed = dist[prev][first] + dist[last][after] - dist[prev][after]
+
+            for c in neighbors[stop]:
+                if c in segment:
+                    continue
+                e = tour[(pos[c] + 1) % num_stops]
+                if e in segment:
+                    continue
+
+                # Insert between c and e, in order or reversed
+                added = dist[c][first] + dist[last][e] - dist[c][e]
+                added_reversed = dist[c][last] + dist[first][e] - dist[c][e]
+                if min(added, added_reversed) - removed < -1e-9:
+                    if added_reversed < added:
+                        segment.reverse()
+                    rest = [other for other in tour if other not in segment]
+                    insert_at = rest.index(c) + 1
+                    tour[:] = rest[:insert_at] + segment + rest[insert_at:]
+                    return (prev, after, c, e, first, last)
+        return None
@@ -0,0 +1,226 @@
+from array import array
+import hashlib
+import mmap
+import struct
+import sys
+
+from edge import Edge
+from graphTree import GraphTree
+from mst import MST
+from shortestPathTree import ShortestPathTree
+
+"""
+Save GraphTree, MST and ShortestPathTree results to a compact binary
+file and load them back.
+
+File layout (native byte order):
+
+  header:        64 bytes, see HEADER below
+  costs:         float64 per vertex (ShortestPathTree only,
+                 inf for vertices that were not reached)
+  edge weights:  float64 per edge (MST only)
+  parents:       int32 parent index per vertex, -1 for none
+  search order:  int32 vertex index per vertex found
+  edge from/to:  int32 vertex indices per edge (MST only)
+  roots:         int32 vertex index per tree root (MST only)
+
+The header holds a fingerprint of the graph the tree was built from.
+Loading maps the file and reads the lists straight out of it through
+memoryviews, so nothing is copied; a file whose fingerprint does not
+match the graph is rejected.
+"""
+
+MAGIC = b"GTREE\x00\x00\x01"
+
+# magic, kind, num vertices, root index, num found, num edges,
+# num roots, total weight, graph fingerprint
+HEADER = struct.Struct("=8sIIiIIId16s")
+HEADER_SIZE = 64
+
+GRAPH_TREE = 0
+MST_TREE = 1
+SHORTEST_PATH_TREE = 2
+
+
+def graph_fingerprint(graph):
+    """
+    Return a 16 byte digest of the vertex names, adjacency
+    and edge weights of the graph
+    """
+    adjacency = graph.get_adjacency_arrays()
+    digest = hashlib.blake2b(digest_size=16)
+    for vertex in graph.get_vertices():
+        digest.update(str(vertex.get_name()).encode("utf-8") + b"\x00")
+    digest.update(array('q', adjacency.offsets).tobytes())
+    digest.update(array('q', adjacency.targets).tobytes())
+    digest.update(adjacency.weights.tobytes())
+    return digest.digest()
+
+
+class VertexView:
+    """
+    This class shows a list of vertex indices as a read only
+    list of the vertices themselves (None for index -1)
+    """
+    def __init__(self, vertices, indices):
+        self.vertices = vertices
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        index = self.indices[pos]
+        if index == -1:
+            return None
+        return self.vertices[index]
+
+    def __iter__(self):
+        for pos in range(len(self.indices)):
+            yield self[pos]
+
+
+class CostView:
+    """
+    This class shows a list of float costs as a read only list
+    in which unreached vertices cost sys.maxsize and whole number
+    costs (such as the root's 0) are ints again
+    """
+    def __init__(self, costs):
+        self.costs = costs
+
+    def __len__(self):
+        return len(self.costs)
+
+    def __getitem__(self, index):
+        cost = self.costs[index]
+        if cost == float("inf"):
+            return sys.maxsize
+        if cost.is_integer():
+            return int(cost)
+        return cost
+
+    def __iter__(self):
+        for index in range(len(self.costs)):
+            yield self[index]
+
+
+class EdgeView:
+    """
+    This class shows the edge arrays of an MST file as a read only
+    list of Edges, each one built when it is looked at
+    """
+    def __init__(self, vertices, from_indices, to_indices, weights):
+        self.vertices = vertices
+        self.from_indices = from_indices
+        self.to_indices = to_indices
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __getitem__(self, pos):
+        return Edge(self.vertices[self.from_indices[pos]],
+                    self.vertices[self.to_indices[pos]], self.weights[pos])
+
+    def __iter__(self):
+        for pos in range(len(self.weights)):
+            yield self[pos]
+
+
+def save_tree(tree, graph, filename):
+    """
+    Write the tree, built from graph, to filename
+    """
+    vertices = graph.get_vertices()
+    num_verts = len(vertices)
+
+    def index_of(vertex):
+        if vertex is None:
+            return -1
+        return graph.get_vert_index(vertex)
+
+    parents = array('i', [index_of(tree.parents[i]) for i in range(num_verts)])
+    search_order = array('i', [index_of(vertex) for vertex in tree.get_search_order()])
+
+    costs = array('d')
+    edge_weights = array('d')
+    edge_from = array('i')
+    edge_to = array('i')
+    roots = array('i')
+    total_weight = 0.0
+
+    if isinstance(tree, ShortestPathTree):
+        kind = SHORTEST_PATH_TREE
+        for i in range(num_verts):
+            if tree.get_cost(i) == sys.maxsize:
+                costs.append(float("inf"))
+            else:
+                costs.append(tree.get_cost(i))
+    elif isinstance(tree, MST):
+        kind = MST_TREE
+        total_weight = tree.get_total_weight()
+        for edge in tree.edges:
+            edge_from.append(index_of(edge.from_vertex))
+            edge_to.append(index_of(edge.to_vertex))
+            edge_weights.append(edge.get_weight())
+        roots = array('i', [index_of(root) for root in tree.get_roots()])
+    else:
+        kind = GRAPH_TREE
+
+    header = HEADER.pack(MAGIC, kind, num_verts, index_of(tree.get_root()),
+                         len(search_order), len(edge_weights), len(roots),
+                         total_weight, graph_fingerprint(graph))
+
+    with open(filename, 'wb') as tree_file:
+        tree_file.write(header.ljust(HEADER_SIZE, b"\x00"))
+        for values in (costs, edge_weights, parents, search_order,
+                       edge_from, edge_to, roots):
+            values.tofile(tree_file)
+
+
+def load_tree(graph, filename):
+    """
+    Map filename and return the GraphTree, MST or ShortestPathTree
+    stored in it, whose lists read directly from the file.
+    Raise ValueError if the file does not hold a tree or the tree
+    was built from a graph that differs from this one
+    """
+    with open(filename, 'rb') as tree_file:
+        data = mmap.mmap(tree_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(data) < HEADER_SIZE or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(filename + " does not hold a saved tree")
+    (magic, kind, num_verts, root_index, num_found, num_edges,
+     num_roots, total_weight, fingerprint) = HEADER.unpack_from(data)
+
+    if num_verts != graph.get_size() or fingerprint != graph_fingerprint(graph):
+        raise ValueError(filename + " was saved from a different graph")
+
+    # Cut the mapped file into its sections without copying
+    view = memoryview(data)
+    pos = HEADER_SIZE
+    sections = []
+    for code, length in (('d', num_verts if kind == SHORTEST_PATH_TREE else 0),
+                         ('d', num_edges), ('i', num_verts), ('i', num_found),
+                         ('i', num_edges), ('i', num_edges), ('i', num_roots)):
+        size = struct.calcsize(code) * length
+        sections.append(view[pos:pos + size].cast(code))
+        pos += size
+    costs, edge_weights, parents, search_order, edge_from, edge_to, roots = sections
+
+    vertices = graph.get_vertices()
+    root = vertices[root_index]
+    parents = VertexView(vertices, parents)
+    search_order = VertexView(vertices, search_order)
+
+    if kind == SHORTEST_PATH_TREE:
+        return ShortestPathTree(root, search_order, parents, vertices, None,
+                                CostView(costs))
+    elif kind == MST_TREE:
+        edges = EdgeView(vertices, edge_from, edge_to, edge_weights)
+        return MST(root, search_order, parents, vertices, edges, total_weight,
+                   list(VertexView(vertices, roots)))
+    return GraphTree(root, search_order, parents, vertices)